@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+# @File    :   benchmarks/bench_tree_render.py
+# @Time    :   2026-10-19 00:58:03
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+"""
+Compare lines per second of `echo` per line with the buffered sink.
+
+Usage:
+
+    python benchmarks/bench_tree_render.py [--lines 100000]
+
+Output goes to `/dev/null`. `echo` styles every line and `click.echo` strips
+the styles again, which is what `tree` did before. The sink is measured with
+forced styling (a terminal) and without it (a pipe or a file).
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nescli.core.tree import Line  # noqa: E402
+from utils import echo, BufferedSink  # noqa: E402
+
+
+def make_lines(count):
+    colors = ['white', 'white', 'white', 'blue']
+    return [
+        Line(f'│ │ ├──file_{i}.txt', fg=colors[i % len(colors)])
+        for i in range(count)
+    ]
+
+
+def per_line_echo(lines, devnull, color):
+    with contextlib.redirect_stdout(devnull):
+        for line in lines:
+            echo(line.content, fg=line.fg, show_prefix=False)
+
+
+def buffered_sink(lines, devnull, color):
+    with BufferedSink(devnull, color=color) as out:
+        for line in lines:
+            out.write(line.content, fg=line.fg)
+
+
+def bench(func, lines, color):
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        start = time.perf_counter()
+        func(lines, devnull, color)
+        return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=100000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+
+    before = bench(per_line_echo, lines, None)
+    print(f'{"echo per line":<22}{before:>12,.0f} lines/s')
+
+    for color in (True, False):
+        after = bench(buffered_sink, lines, color)
+        print(f'{f"sink, color={color}":<22}{after:>12,.0f} lines/s  x{after / before:.1f}')
+
+
+if __name__ == '__main__':
+    main()
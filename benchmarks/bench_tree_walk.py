@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# @File    :   benchmarks/bench_tree_walk.py
+# @Time    :   2026-10-18 21:40:22
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+"""
+Compare the sequential tree walk with the threaded one.
+
+Usage:
+
+    python benchmarks/bench_tree_walk.py [PATH] [--jobs 1 4 8] [--latency MS]
+
+Without PATH a synthetic tree is created in a temporary folder.
+`--latency` adds a delay to every directory listing to emulate a network filesystem.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nescli.core.tree import Walker  # noqa: E402
+
+
+def build_tree(root, width=8, depth=4, files=10):
+    paths = [root]
+    for _ in range(depth):
+        children = []
+        for path in paths:
+            for i in range(width):
+                child = os.path.join(path, f'dir{i}')
+                os.mkdir(child)
+                for j in range(files):
+                    open(os.path.join(child, f'file{j}.txt'), 'w').close()
+                children.append(child)
+        paths = children
+
+
+def with_latency(latency):
+    list_dir = Walker.list_dir
+
+    def slow_list_dir(self, *args):
+        time.sleep(latency)
+        return list_dir(self, *args)
+
+    Walker.list_dir = slow_list_dir
+
+
+def bench(path, jobs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in Walker(max_depth=0, jobs=jobs).walk(path))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', nargs='?')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.latency:
+        with_latency(args.latency / 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if not path:
+            path = tmp
+            build_tree(path, depth=3 if args.latency else 4)
+
+        baseline = None
+        for jobs in args.jobs:
+            count, elapsed = bench(path, jobs, args.repeat)
+            baseline = baseline or elapsed
+            print(f'jobs={jobs:<3} nodes={count:<8} {elapsed:8.3f}s  x{baseline / elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@
 
 import os
 import sys
+import json
+import time
 import functools
 from collections import namedtuple
 from pathlib import Path
@@ -16,8 +18,13 @@ import click
 
 from utils import es, msgbox, echo, futil
 from nescli import config
+from nescli.core.config import BACKEND_ENV, open_store
+from nescli.core.storage import JournalStore, migrate as migrate_store
 
+# Older versions kept every template in one dict under this key.
 KEY_CONFIG_TEMPLATES = 'config_templates'
+# Each template is now a key of its own, so one template is one row to read or write.
+TEMPLATE_PREFIX = KEY_CONFIG_TEMPLATES + '.'
 
 Template = namedtuple('Template', ['name', 'desc'])
 
@@ -40,31 +47,45 @@ def _vscode_is_available():
 
 
 def use_config(func):
-    confs = config.get(KEY_CONFIG_TEMPLATES, {})
 
     @functools.wraps(func)
     def inner(*args, **kwargs):
-        confs = config.get(KEY_CONFIG_TEMPLATES, {})
-        kwargs.setdefault('confs', confs)
-        result = func(*args, **kwargs)
-        config.set(KEY_CONFIG_TEMPLATES, confs)
-        return result
+        # Nested template helpers share one write of the config file, and
+        # the templates of the old dict move to their own keys with it.
+        with config.transaction():
+            legacy = config.get(KEY_CONFIG_TEMPLATES)
+            if legacy is not None:
+                for key, value in legacy.items():
+                    config.set(TEMPLATE_PREFIX + key, value)
+                config.remove(KEY_CONFIG_TEMPLATES)
+            return func(*args, **kwargs)
 
     return inner
 
 
-@use_config
-def _set_template(key: str, name: str, desc: str = None, edit: bool = True, ** kwargs):
+def _templates() -> dict:
+    """
+    Every template, read by the prefix of their keys.
+    """
+    templates = dict(config.get(KEY_CONFIG_TEMPLATES, {}))
+    templates.update({
+        key[len(TEMPLATE_PREFIX):]: value
+        for key, value in config.items(TEMPLATE_PREFIX).items()
+    })
+    return templates
+
+
+def _set_template(key: str, name: str, desc: str = None, edit: bool = True):
 
     old = _get_template(key, _echo=False)
     basename = os.path.basename(name)
 
+    # Asked before the config is locked, other nescli commands would wait for the answer.
     if old:
         if old == [basename, desc] or not echo.confirm_replace(key, old):
             return
 
-    confs = kwargs.get('confs')
-    confs[key] = [basename, desc]
+    _save_template(key, basename, desc)
 
     echo.statments(
         'Set template: ',
@@ -88,8 +109,14 @@ def _set_template(key: str, name: str, desc: str = None, edit: bool = True, ** k
 
 
 @use_config
-def _get_template(key, _echo=True, **kwargs) -> Template:
-    value = kwargs.get('confs').get(key, None)
+def _save_template(key: str, basename: str, desc: str):
+    config.set(TEMPLATE_PREFIX + key, [basename, desc])
+
+
+def _get_template(key, _echo=True) -> Template:
+    value = config.get(TEMPLATE_PREFIX + key)
+    if value is None:
+        value = config.get(KEY_CONFIG_TEMPLATES, {}).get(key)
 
     if not value:
         if _echo:
@@ -100,9 +127,8 @@ def _get_template(key, _echo=True, **kwargs) -> Template:
 
 
 @use_config
-def _update_template_desc(key, desc, **kwargs):
-    confs = kwargs.get('confs')
-    confs[key][1] = desc
+def _update_template_desc(key, desc):
+    config.set(TEMPLATE_PREFIX + key, [_get_template(key).name, desc])
     echo.statments(
         'Description for key: ',
         es(key).magenta.bold.underline,
@@ -112,7 +138,7 @@ def _update_template_desc(key, desc, **kwargs):
 
 
 @use_config
-def _remove_template(key, **kwargs):
+def _remove_template(key):
 
     template = _get_template(key)
 
@@ -123,8 +149,7 @@ def _remove_template(key, **kwargs):
     if os.path.exists(temp_file):
         os.remove(temp_file)
 
-    confs = kwargs.get('confs')
-    del confs[key]
+    config.remove(TEMPLATE_PREFIX + key)
 
     echo.remove_key(key)
 
@@ -259,7 +284,7 @@ def use(key, path):
 
 @confcli.command('list')
 def list_confs():
-    confs = config.get(KEY_CONFIG_TEMPLATES, {})
+    confs = _templates()
 
     if len(confs) == 0:
         echo('No configuration. Use `conf add` to create configurations.')
@@ -294,3 +319,92 @@ def save(key, path, desc):
     """
     _set_template(key, path, desc, edit=False)
     echo.done()
+
+
+def _journal():
+    if isinstance(config.store, JournalStore):
+        return config.store
+
+    echo(f'History needs the journal backend, set {BACKEND_ENV}=journal to use it.')
+
+
+@confcli.command()
+def history():
+    """
+    Show the changes kept in the config journal, the latest last.
+    """
+    journal = _journal()
+
+    if not journal:
+        return
+
+    operations = journal.history()
+
+    if not operations:
+        echo('No change recorded yet.')
+        return
+
+    echo.print_title('Config history')
+    data = [['SEQ', 'TIME', 'OP', 'KEY', 'VALUE']]
+    data += [
+        [
+            str(op['seq']),
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(op['time'])),
+            op['op'] + (' (undone)' if op['undone'] else ''),
+            op['key'],
+            json.dumps(op['value']) if 'value' in op else '',
+        ]
+        for op in operations
+    ]
+    echo.table(data)
+
+
+@confcli.command()
+def undo():
+    """
+    Cancel the last change of the config journal.
+    """
+    journal = _journal()
+
+    if not journal:
+        return
+
+    operation = journal.undo()
+
+    if not operation:
+        echo('Nothing to undo.')
+        return
+
+    config.reload()
+    echo.statments(
+        'Undone: ',
+        es(f"{operation['op']} {operation['key']}").magenta.bold.underline
+    )
+    echo.done()
+
+
+@confcli.command()
+@click.option('-b', '--backend', type=click.Choice(['sqlite', 'journal']), default='sqlite', show_default=True,
+              help='Backend to copy the config into.')
+def migrate(backend):
+    """
+    Copy the JSON config file `~/.nescli.conf` into another backend.
+
+    The JSON file is left as is. Set the `NESCLI_CONFIG_BACKEND` environment
+    variable to the backend afterwards to use it.
+    """
+    source = open_store('json')
+
+    if not os.path.exists(source.path):
+        echo.not_found(source.path)
+        return
+
+    target = open_store(backend)
+    count = migrate_store(source, target)
+
+    echo.statments(
+        f'Copied {count} keys to: ',
+        es(target.path).magenta.bold.underline
+    )
+    echo(f'Set {BACKEND_ENV}={backend} to use it.')
+    echo.done()
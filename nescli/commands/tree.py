@@ -11,8 +11,9 @@
 
 import os
 import sys
-from collections import namedtuple
-from typing import List
+import shutil
+import itertools
+import collections
 
 from click import (
     command,
@@ -24,11 +25,18 @@ from click import (
 
 import click
 
-from utils.strutil import TabChar
-from utils import echo
-from nescli import config
-
-Line = namedtuple('Line', ['content', 'fg'], defaults=["", 'white'])
+from utils.strutil import human_size
+from utils import echo, BufferedSink
+from nescli import tree as tree_api
+from nescli.core.tree import (
+    ListingCache, Stats, Walker, is_archive,
+    render, totals, ndjson, json_array, html
+)
+from nescli.core.tree import snapshot
+from nescli.core.tree.dupes import duplicates, reclaimable
+from nescli.core.tree.gitstatus import GitStatus
+from nescli.core.tree.order import STAT_KEYS
+from nescli.core.tree.watch import Watcher, supported as watch_supported
 
 # config = dict(
 
@@ -44,159 +52,317 @@ Line = namedtuple('Line', ['content', 'fg'], defaults=["", 'white'])
         show_default=True)
 @option('-h/-H', 'show_hidden',
         help='Show hidden files, default is False.')
+@option('--follow-links/--no-follow-links',
+        default=False,
+        help='Descend into symbolic links to directories. Directories already shown are not walked again.',
+        show_default=True)
+@option('-j', '--jobs',
+        default=1,
+        type=click.IntRange(min=1),
+        help='Number of threads listing directories ahead of the output. Helps on network filesystems.',
+        show_default=True)
+@option('--cache/--no-cache', 'use_cache',
+        default=True,
+        help='Reuse the listings of directories which did not change since the last run.',
+        show_default=True)
+@option('--cache-stats',
+        is_flag=True,
+        help='Show the statistics of the listing cache and exit.')
+@option('--gitignore',
+        is_flag=True,
+        help='Hide the entries ignored by `.gitignore` files. Ignored directories are not walked.')
+@option('--exclude',
+        multiple=True,
+        help='Hide entries matching this `.gitignore` style pattern. Can be repeated.')
+@option('--include',
+        multiple=True,
+        help='Only show files matching this `.gitignore` style pattern. Can be repeated.')
+@option('--du',
+        is_flag=True,
+        help='Show the disk usage of every entry, directories show the total of their whole subtree.')
+@option('--by-size',
+        is_flag=True,
+        help='With `--du`, list the largest entries of each directory first.')
+@option('--format', 'output_format',
+        type=click.Choice(['text', 'json', 'ndjson', 'html']),
+        default='text',
+        help='Output format. `json` and `ndjson` write one record per entry as the walk goes, '
+             '`html` writes a page with collapsible directories.',
+        show_default=True)
+@option('--max-entries-per-dir', 'max_entries',
+        type=click.IntRange(min=1),
+        help='Show the first N entries of each directory, and count the others.')
+@option('--time-budget',
+        type=click.FloatRange(min=0),
+        help='Stop listing directories after this many seconds. Directories left are marked as truncated.')
+@option('--sort',
+        type=click.Choice(['name', 'natural', 'size', 'mtime', 'ext']),
+        help='Sort the entries of each directory. `natural` compares numbers in names by value. '
+             'Entries are listed in the filesystem order by default.')
+@option('--dirs-first',
+        is_flag=True,
+        help='List directories before the other entries.')
+@option('--reverse',
+        is_flag=True,
+        help='Reverse the sort order.')
+@option('--stats', 'show_stats',
+        is_flag=True,
+        help='After the tree, show the number of entries per type and per extension. Their size is '
+             'shown when the walk reads it anyway, with `--du`, `--sort size|mtime` or a json format.')
+@option('--watch',
+        is_flag=True,
+        help='Keep the tree on screen and update it when entries are added or removed. Linux only.')
+@option('--save-snapshot', 'snapshot_file',
+        type=click.Path(dir_okay=False, writable=True),
+        help='Save the entries with their size and mtime to this file instead of printing the tree.')
+@option('--diff', 'diff_file',
+        type=click.Path(exists=True, dir_okay=False),
+        help='Only show the entries added, removed or modified since the snapshot in this file. '
+             'Use the same options as when the snapshot was saved.')
+@option('--git', 'show_git',
+        is_flag=True,
+        help='Mark entries with their git status: U conflict, M modified, S staged, ? untracked, ! ignored. '
+             'Directories show the most important status inside them.')
+@option('--dupes',
+        is_flag=True,
+        help='Instead of the tree, list the files with the same content and the space they waste. '
+             'Files are hashed on `--jobs` threads.')
 @argument('target', default='.')
-def tree(depth, target, show_hidden):
+def tree(depth, target, show_hidden, follow_links, jobs, use_cache, cache_stats,
+         gitignore, exclude, include, du, by_size, output_format, max_entries, time_budget,
+         sort, dirs_first, reverse, show_stats, watch, snapshot_file, diff_file, show_git, dupes):
     """
         Print the file structure for the target directory which will be current directory by default.
 
         Arguments:
 
         TARGET  
-            The path to show, default is the current directory. This arg can not be file.
+            The path to show, default is the current directory. This arg can be a directory,
+            or a `.zip`, `.whl` or `.tar*` archive whose members are shown without extracting it.
     """
+    if cache_stats:
+        _print_cache_stats(ListingCache())
+        return
+
     abspath = os.path.abspath(target)
+    archive = is_archive(abspath)
 
-    if not _is_directory(abspath):
+    if not archive and not _is_directory(abspath):
         raise click.BadParameter(
-            f'Target must be a directory. But got a file: {abspath!r}')
-
-    config.set('show_hidden', show_hidden)
-    config.set('max_depth', depth)
-    config.set('indent', 2)
-    config.set('indent_char', TabChar.INDENT)
-
-    result = _format_sublines(_print_structure(abspath))
-
-    if len(result) == 0:
-        echo(f'Target directory {abspath!r} is empty.', fg='red')
+            f'Target must be a directory or an archive. But got a file: {abspath!r}')
+
+    options = dict(
+        follow_links=follow_links, jobs=jobs,
+        cache=ListingCache() if use_cache and not (archive or watch) else None,
+        gitignore=gitignore, exclude=exclude, include=include, du=du,
+        collect_stat=output_format in ('json', 'ndjson'),
+        max_entries=max_entries, time_budget=time_budget,
+        sort=sort, dirs_first=dirs_first, reverse=reverse)
+
+    if dupes:
+        if archive:
+            raise click.UsageError('`--dupes` only works on a directory, archive members can not be hashed.')
+        options.update(collect_stat=True)
+        nodes = tree_api.walk(abspath, depth, show_hidden, **options)
+        _print_dupes(abspath, duplicates(nodes, workers=jobs))
         return
 
-    echo.print_title(f"Structure for path {abspath!r}")
-    echo(
-        TabChar.CORNER_TOP_LEFT + abspath.split('/')[-1],
-        fg='blue', show_prefix=False)
-
-    for line in result:
-        echo(line.content, fg=line.fg, show_prefix=False)
-
-
-def _print_structure(path, depth=0) -> List[Line]:
-
-    if depth > config.get('max_depth') > 0:
-        return []
-
-    if _is_file(path):
+    if snapshot_file or diff_file:
+        if du or watch:
+            raise click.UsageError('`--save-snapshot` and `--diff` can not be used with `--du` or `--watch`.')
+        # Snapshots are compared with a merge, both walks need the same order.
+        # Every entry is stat fresh, a file can change without its directory.
+        options.update(sort='name', dirs_first=False, reverse=False, collect_stat=True, cache=None)
+
+    if watch:
+        if not watch_supported():
+            raise click.UsageError('`--watch` needs inotify, which is only available on Linux.')
+        if archive or du or show_stats or output_format != 'text':
+            raise click.UsageError(
+                '`--watch` only works with the text output of a directory, '
+                'without `--du` or `--stats`.')
+        _follow(Watcher(Walker(max_depth=depth, show_hidden=show_hidden, **options), abspath))
+        return
 
-        if depth == 0:
-            raise click.BadParameter(
-                f'tree can only show the structure of directories, but got file {path}')
+    nodes = tree_api.walk(abspath, depth, show_hidden, **options)
+    root = next(nodes)
 
-        return [Line(TabChar.INDENT + path.split('/')[-1])]
+    if snapshot_file:
+        count = snapshot.save(snapshot_file, snapshot.entries(itertools.chain([root], nodes)))
+        echo(f'Saved {count:,} entries of {abspath!r} to {snapshot_file!r}.')
+        return
 
-    contents = _filtered_contents(path)
+    if diff_file:
+        nodes = _diff(diff_file, root, nodes)
+        changes = collections.Counter(node.change for node in nodes if node.change)
+        root = nodes.pop(0)
+        nodes = iter(nodes)
 
-    if len(contents) == 0:
-        return []
+    if du:
+        nodes = totals(nodes, by_size=by_size)
 
-    lines = []
+    if show_git and not archive:
+        git_status = GitStatus.read(abspath)
+        if git_status is None:
+            echo(f'{abspath!r} is not in a git work tree, `--git` is ignored.', fg='yellow')
+        else:
+            nodes = git_status.annotate(nodes)
+            root.git = git_status.get(abspath)
 
-    for i, content in enumerate(contents):
+    if output_format == 'html':
+        with BufferedSink(color=False) as out:
+            for chunk in html(itertools.chain([root], nodes), title=f'Structure for path {abspath!r}'):
+                out.write(chunk, nl=False)
+        return
 
-        prefix = TabChar.INDENT
-        fg = 'white'
-        content_path = os.path.join(path, content)
-        sublines = []
-        is_last_directory = False
-        if _is_directory(content_path):
-            fg = 'blue'
-            if i == len(contents) - 1:
-                is_last_directory = True
+    if output_format != 'text':
+        # The total of the root is only known at the end of a `du` walk.
+        nodes = itertools.chain(nodes, [root]) if du else itertools.chain([root], nodes)
+        writer = ndjson if output_format == 'ndjson' else json_array
+        with BufferedSink(color=False) as out:
+            for chunk in writer(nodes):
+                out.write(chunk, nl=output_format == 'ndjson')
+            if output_format == 'json':
+                out.write('')
+        return
 
-            sublines = _print_structure(content_path, depth=depth+1)
-            if len(sublines) > 0:
-                prefix = TabChar.BRANCH_TOP
+    if diff_file and not root.has_children:
+        echo(f'No changes in {abspath!r} since the snapshot.')
+        return
 
-            lines.append(Line(prefix + content, fg=fg))
-            lines += _format_sublines(sublines)
-        else:
-            lines.append(Line(prefix + content, fg=fg))
+    if not root.has_children:
+        echo(f'Target directory {abspath!r} is empty.', fg='red')
+        return
 
-    return lines
+    echo.print_title(f"Structure for path {abspath!r}")
 
+    # Only these walks stat every entry, `--follow-links` alone stats directories.
+    stats = Stats(depth, sized=bool(archive or du or options['collect_stat'] or sort in STAT_KEYS))
+    if show_stats:
+        nodes = stats.count(nodes)
 
-def _format_sublines(sublines):
-    lines = []
-    for j, subline in enumerate(sublines):
-        content = subline.content
-        if _is_child_for_current_directory(content):
-            prefix = TabChar.BRANCH_LEFT + TabChar.INDENT
-            if j == len(sublines) - 1:
-                prefix = TabChar.CORNER_BOTTOM_LEFT + TabChar.INDENT
-        else:
-            prefix = TabChar.PIPE + " "
-        lines.append(Line(prefix + content, fg=subline.fg))
+    with BufferedSink() as out:
+        for line in render(itertools.chain([root], nodes)):
+            out.write(line.content, fg=line.fg)
 
-    return _remove_detached_pipes(lines)
+    if du:
+        echo(f'{human_size(root.usage)} used in total.', show_prefix=False)
 
+    if diff_file:
+        echo(f"{changes['+']:,} added, {changes['-']:,} removed, {changes['~']:,} modified.",
+             show_prefix=False)
 
-def _remove_detached_pipes(lines):
+    if show_stats:
+        _print_stats(stats)
 
-    if len(lines) == 0:
-        return lines
 
-    has_detached_pipes = lines[-1].content.startswith(TabChar.PIPE)
+def _diff(diff_file, root, nodes):
+    """
+    Build the nodes of the changes between the snapshot and the current walk.
+    """
+    current = snapshot.entries(itertools.chain([root], nodes))
 
-    if not has_detached_pipes:
-        return lines
+    try:
+        return snapshot.nodes(snapshot.diff(snapshot.load(diff_file), current), root.path)
+    except (ValueError, OSError, EOFError) as e:
+        nodes.close()
+        raise click.BadParameter(str(e), param_hint='--diff')
 
-    formatted_lines = []
 
-    for line in reversed(lines):
+def _follow(watcher: Watcher):
+    """
+    Print the tree of `watcher`, then redraw it after every burst of changes.
+    """
+    echo.print_title(f"Watching path {watcher.path!r}, press Ctrl+C to stop")
+    lines = _draw([], list(render(watcher.nodes())))
+
+    try:
+        while True:
+            changed = watcher.changes()
+            if changed:
+                watcher.refresh(changed)
+                lines = _draw(lines, list(render(watcher.nodes())))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _draw(shown, lines):
+    """
+    Replace the `shown` lines at the bottom of the terminal by `lines`.
 
-        if has_detached_pipes and line.content.startswith(TabChar.PIPE):
-            formatted_lines.append(
-                Line(' ' + line.content[1:], fg=line.fg)
-            )
-            continue
+    Only the lines from the first one which changed are written again. When
+    the output is not a terminal, or the tree is taller than the terminal,
+    the whole tree is written.
+    """
+    same = 0
+    while same < min(len(shown), len(lines)) and shown[same] == lines[same]:
+        same += 1
+
+    with BufferedSink() as out:
+        if not out.color or len(shown) >= shutil.get_terminal_size().lines:
+            same = 0
+            if shown:
+                out.write('', nl=True)
+        elif len(shown) > same:
+            # Move to the start of the first changed line and clear below it.
+            out.write(f'\033[{len(shown) - same}F\033[J', nl=False)
+
+        for line in lines[same:]:
+            out.write(line.content, fg=line.fg)
 
-        has_detached_pipes = False
-        formatted_lines.append(line)
+    return lines
 
-    return list(reversed(formatted_lines))
 
+def _print_dupes(abspath, groups):
+    if not groups:
+        echo(f'No duplicate files under {abspath!r}.')
+        return
 
-def _is_child_for_current_directory(content):
-    return content.startswith(TabChar.INDENT) or content.startswith(TabChar.BRANCH_TOP)
+    echo.print_title(f'Duplicate files under {abspath!r}')
 
+    for group in groups:
+        echo(f'{len(group.paths)} files of {human_size(group.size)}, '
+             f'{human_size(reclaimable(group))} reclaimable', fg='yellow', show_prefix=False)
+        for path in group.paths:
+            echo(f'  {os.path.relpath(path, abspath)}', show_prefix=False)
 
-def _is_python_cache(name):
-    return name.startswith('__') and name.endswith('__')
+    total = sum(reclaimable(group) for group in groups)
+    echo(f'{len(groups):,} groups of duplicates, {human_size(total)} could be reclaimed.')
 
 
-def _filtered_contents(path):
-    contents = os.listdir(path)
+def _print_stats(stats: Stats):
+    # Sizes are only known when the walk collected the stat of the entries.
+    def sized(*columns):
+        return list(columns) if stats.sized else []
 
-    if not config.get('show_hidden'):
-        contents = list(filter(lambda x: not x.startswith('.') and not (
-            x.startswith('__') and x.endswith('__')), contents))
+    echo.print_title('Entries per type')
+    echo.table([['TYPE', 'COUNT'] + sized('SIZE')] + [
+        [kind, f'{count:,}'] + sized(human_size(stats.type_bytes[kind]))
+        for kind, count in sorted(stats.types.items()) if count
+    ] + ([['omitted', f'{stats.omitted:,}'] + sized('-')] if stats.omitted else []))
 
-    return contents
+    if stats.extensions:
+        order = stats.extension_bytes if stats.sized else stats.extensions
+        echo.print_title('Files per extension')
+        echo.table([['EXTENSION', 'COUNT'] + sized('SIZE')] + [
+            [extension, f'{stats.extensions[extension]:,}'] + sized(human_size(stats.extension_bytes[extension]))
+            for extension, _ in order.most_common()
+        ])
 
 
-def _build_line(line: Line, depth):
-    content = line.content
-    if content.startswith(TabChar.INDENT) or content.startswith(TabChar.BRANCH_TOP):
-        content = (
-            TabChar.BRANCH_LEFT +
-            config['indent_char'] +
-            content)
+def _print_cache_stats(cache: ListingCache):
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    ratio = f"{stats['hits'] / lookups:.1%}" if lookups else '-'
 
-    return click.style(content, fg=line.fg)
+    echo.print_title(f'Listing cache {cache.folder!r}')
+    echo.table([
+        ['SNAPSHOTS', 'SIZE', 'HITS', 'MISSES', 'HIT RATIO'],
+        [str(stats['snapshots']), f"{stats['size']:,}", str(stats['hits']), str(stats['misses']), ratio],
+    ])
 
 
 def _is_directory(path):
     return os.path.isdir(path)
-
-
-def _is_file(path):
-    return os.path.isfile(path)
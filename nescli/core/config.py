@@ -7,9 +7,10 @@
 """ Configuration Management """
 
 import os
-import json
-from pathlib import Path
-from typing import Dict, TypeVar
+import contextlib
+from typing import Any, Dict, Iterator, TypeVar
+
+from .storage import REMOVED, JSONStore, JournalStore, SQLiteStore, Store, apply
 
 default_config = dict(
     user='undefined',
@@ -19,50 +20,187 @@ default_config = dict(
 
 T = TypeVar('T')
 
+# Environment variable which selects the storage backend of the config.
+BACKEND_ENV = 'NESCLI_CONFIG_BACKEND'
+
+
+BACKENDS = ('json', 'journal', 'sqlite')
+
+
+def open_store(backend: str = 'json', path: str = None, namespace: str = 'main') -> Store:
+    """
+    Create the store of the given backend, in the home folder by default.
+
+    - `json` keeps every value in `~/.nescli.conf`.
+    - `journal` appends the changes to `~/.nescli.journal`, which starts from
+      the values of `~/.nescli.conf` when it does not exist yet.
+    - `sqlite` keeps one table per namespace in `~/.nescli.db`, see
+      `conf migrate` to copy the JSON file into it.
+
+    Only the `sqlite` backend has namespaces other than `main`.
+    """
+    home = os.environ.get('HOME')
+    json_path = os.path.join(home, '.nescli.conf')
+
+    if backend == 'sqlite':
+        return SQLiteStore(path or os.path.join(home, '.nescli.db'), default_config, namespace)
+    if namespace != 'main':
+        raise ValueError(f'The {backend} config backend has no namespace {namespace!r}')
+
+    if backend == 'json':
+        return JSONStore(path or json_path, default_config)
+    if backend == 'journal':
+        return JournalStore(path or os.path.join(home, '.nescli.journal'), default_config, seed=json_path)
+
+    raise ValueError(f'Unknown config backend: {backend}')
+
 
 class CLIConfig:
 
-    def __init__(self, path=None):
-        self._path = path or os.path.join(
-            os.environ.get('HOME'), '.nescli.conf')
-        self._conf = self._load_config()
+    """
+    Key value settings, stored as JSON in `~/.nescli.conf` by default.
+
+    The `backend` argument, or the `NESCLI_CONFIG_BACKEND` environment
+    variable, selects another store, see :func:`open_store`.
+
+    The store is only read on the first access to a value, so creating the
+    global `config` at import time costs no file system access. Setting a
+    value does not read it either. With a store which reads keys one by one,
+    `get` and `items` read what they return only, until something needs
+    every value.
+
+    Several processes can share the store. Writes hold an exclusive `flock`
+    on `<path>.lock` and apply only the keys this process changed, so the
+    keys written meanwhile by others are kept. A transaction holds the lock
+    from its start, its reads are up to date.
+    """
+
+    def __init__(self, path=None, backend=None, namespace='main'):
+        self.store = open_store(backend or os.environ.get(BACKEND_ENV, 'json'), path, namespace)
+        self._path = self.store.path
+        self._data = None
+        self._depth = 0
+        self._changes: Dict[str, Any] = {}
+
+    @property
+    def _conf(self) -> Dict:
+        if self._data is None:
+            self._data = self._load_config()
+            # Keys set in a transaction before the first read.
+            apply(self._data, self._changes)
+        return self._data
 
     def _load_config(self) -> Dict:
         """
-        Load config object from the given path.
-
-        If no path is provided, the config file will be stored in `~/.nescli.conf`.
+        Load every value from the store.
 
         Returns
         -------
         Dict
             Config object.
         """
-        if os.path.exists(self._path):
-            return json.loads(Path(self._path).read_text())
-
-        return default_config
+        return self.store.load()
 
     def get(self, key: str, default: T = None) -> str | T:
         """
         read string value from config file. None if the key is not found.
         """
+        if self._data is None and self.store.partial:
+            if key not in self._changes:
+                return self.store.get(key, default)
+            value = self._changes[key]
+            return default if value is REMOVED else value
+
         return self._conf.get(key, default)
 
+    def items(self, prefix: str = '') -> Dict:
+        """
+        The values whose key starts with `prefix`.
+        """
+        if self._data is None and self.store.partial:
+            values = self.store.items(prefix)
+            apply(values, {key: value for key, value in self._changes.items() if key.startswith(prefix)})
+            return values
+
+        return {key: value for key, value in self._conf.items() if key.startswith(prefix)}
+
     def set(self, key: str, value):
         """
         set new key value pair to the config file.
-        """
-        self._conf[key] = value
-        self._write_config()
 
-    def _write_config(self):
-        with open(self._path, 'w') as f:
-            f.write(json.dumps(self._conf))
+        Nothing is written when the config already holds the value. Without
+        a loaded config, only the stores which read one key check it.
+        """
+        if self._data is not None or self.store.partial:
+            if self.get(key, REMOVED) == value:
+                return
+        if self._data is not None:
+            self._data[key] = value
+        self._changed(key, value)
 
     def remove(self, key: str):
-        del self._conf[key]
-        self._write_config()
+        if self._data is None and self.store.partial:
+            if self.get(key, REMOVED) is REMOVED:
+                raise KeyError(key)
+        else:
+            del self._conf[key]
+        self._changed(key, REMOVED)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator['CLIConfig']:
+        """
+        Batch `set` and `remove` calls into one write of the config file.
+
+        The file is written once when the outermost block exits, and only if
+        something changed. Nested blocks join the outer one. When the block
+        raises, the changes are dropped and the file is loaded again.
+
+        The outermost block locks the file and loads it again, so a read,
+        modify and write cycle can not be interleaved with another process.
+
+        .. code-block:: python
+
+            with config.transaction():
+                config.set('user', 'Nestor')
+                config.set('email', 'admin@nestor.me')
+        """
+        with self.store.lock():
+            if self._depth == 0:
+                self._data = None
+
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                if self._depth == 1:
+                    self._data = None
+                    self._changes.clear()
+                raise
+            finally:
+                self._depth -= 1
+
+            if self._depth == 0 and self._changes:
+                self._write_config()
+
+    def reload(self):
+        """
+        Forget the loaded values, the next access reads the store again.
+        """
+        self._data = None
+
+    def _changed(self, key: str, value):
+        self._changes[key] = value
+        if not self._depth:
+            self._write_config()
+
+    def _write_config(self):
+        """
+        Write the changed keys to the store.
+        """
+        merged = self.store.write(self._changes)
+        if merged is not None:
+            self._data = merged
+        self._changes.clear()
 
     @property
     def keys(self):
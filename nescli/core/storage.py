@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+# @File    :   storage.py
+# @Time    :   2026-10-19 11:20:37
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Storage backends of the configuration """
+
+import os
+import re
+import abc
+import json
+import time
+import sqlite3
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, not available on Windows
+    fcntl = None
+
+# Marks a removed key in the changes given to `Store.write`.
+REMOVED = object()
+
+# Start of the first line of a journal, the values are written after it.
+_BASE_HEADER = re.compile(rb'\{"op": "base", "last": (\d+), "size": (\d+), "value": ')
+
+
+class Store(abc.ABC):
+
+    """
+    Where `CLIConfig` keeps its values.
+
+    A store loads every value at once and writes the keys a process changed,
+    as a dict of key to new value or `REMOVED`. Writes must keep the keys
+    changed meanwhile by other processes. `lock` serializes processes on a
+    `<path>.lock` file and can be entered again by the same store.
+
+    Stores with `partial` set read single keys and prefixes without loading
+    everything, the others answer `get` and `items` from `load`.
+
+    Parameters
+    ----------
+    path : str
+        The file of the store.
+    defaults : Dict
+        The values of an empty store.
+    """
+
+    partial = False
+
+    def __init__(self, path: str, defaults: Dict):
+        self.path = path
+        self.defaults = defaults
+        self._lock_fd = None
+
+    @abc.abstractmethod
+    def load(self) -> Dict:
+        """
+        Every value of the store.
+        """
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.load().get(key, default)
+
+    def items(self, prefix: str = '') -> Dict:
+        """
+        The values whose key starts with `prefix`.
+        """
+        return {key: value for key, value in self.load().items() if key.startswith(prefix)}
+
+    @abc.abstractmethod
+    def write(self, changes: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Save `changes`, returns every value when they are known without extra reads.
+        """
+
+    def restore(self, values: Dict):
+        """
+        Save `values` copied from another store.
+        """
+        self.write(values)
+
+    @contextlib.contextmanager
+    def lock(self):
+        if fcntl is None or self._lock_fd is not None:
+            yield
+            return
+
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            self._lock_fd = fd
+            yield
+        finally:
+            self._lock_fd = None
+            # Closing the descriptor releases the lock.
+            os.close(fd)
+
+
+class JSONStore(Store):
+
+    """
+    Every value in one JSON document, rewritten on each write.
+    """
+
+    def load(self) -> Dict:
+        if os.path.exists(self.path):
+            return json.loads(Path(self.path).read_text())
+
+        return dict(self.defaults)
+
+    def write(self, changes: Dict[str, Any]) -> Dict:
+        """
+        Merge `changes` into the file on disk and replace it atomically.
+        """
+        with self.lock():
+            merged = self.load()
+            apply(merged, changes)
+            atomic_write(self.path, json.dumps(merged))
+
+        return merged
+
+
+class JournalStore(Store):
+
+    """
+    Set and remove operations appended to a journal, one JSON line each.
+
+    A write only appends the changed keys, whatever the size of the
+    configuration. Loading replays the journal from the values of its first
+    line. When the operations after the first line grow past `max_size`
+    bytes, the journal is compacted: the operations but the last `keep` ones
+    are folded into the first line.
+
+    The first line starts with the number of the last folded operation and
+    the size of the values, so a write finds where the operations start
+    without reading the values. A last line cut by a crash is skipped when
+    reading and removed by the next write.
+
+    The kept operations are the history. `undo` cancels the last operation
+    not cancelled yet, by appending an `undo` line which replays skip.
+
+    Parameters
+    ----------
+    seed : str
+        A JSON config file which gives the first values of a new journal.
+    """
+
+    def __init__(self, path: str, defaults: Dict, seed: str = None,
+                 max_size: int = 1024 * 1024, keep: int = 100):
+        super().__init__(path, defaults)
+        self.seed = seed
+        self.max_size = max_size
+        self.keep = keep
+
+    def load(self) -> Dict:
+        base, operations = self._read()
+        return replay(base, operations)
+
+    def write(self, changes: Dict[str, Any]) -> None:
+        with self.lock():
+            seq = self._last_seq() + 1
+            now = time.time()
+            lines = []
+
+            for key, value in changes.items():
+                operation = dict(seq=seq, time=now, op='remove' if value is REMOVED else 'set', key=key)
+                if value is not REMOVED:
+                    operation['value'] = value
+                lines.append(json.dumps(operation) + '\n')
+                seq += 1
+
+            self._append(''.join(lines))
+
+    def restore(self, values: Dict):
+        """
+        Start the journal again from the current values updated with `values`.
+
+        The values become the first line, so the history starts empty instead
+        of with one operation per copied key.
+        """
+        with self.lock():
+            exists = os.path.exists(self.path)
+            base = self.load() if exists else {}
+            base.update(values)
+            atomic_write(self.path, _base_line(self._last_seq() if exists else 0, base))
+
+    def history(self) -> List[Dict]:
+        """
+        The operations kept in the journal, with `undone` set on the cancelled ones.
+        """
+        _, operations = self._read()
+        cancelled = _cancelled(operations)
+
+        return [
+            dict(operation, undone=operation['seq'] in cancelled)
+            for operation in operations if operation['op'] != 'undo'
+        ]
+
+    def undo(self) -> Optional[Dict]:
+        """
+        Cancel the last operation, returns it or `None` when there is none left.
+        """
+        with self.lock():
+            history = [operation for operation in self.history() if not operation['undone']]
+            if not history:
+                return None
+
+            last = history[-1]
+            undo = dict(seq=self._last_seq() + 1, time=time.time(), op='undo', target=last['seq'])
+            self._append(json.dumps(undo) + '\n')
+            return last
+
+    def compact(self):
+        """
+        Fold all the operations but the last `keep` ones into the first line.
+        """
+        with self.lock():
+            base, operations = self._read()
+            split = max(len(operations) - self.keep, 0)
+            cancelled = _cancelled(operations)
+
+            folded = dict(base)
+            apply_operations(folded, operations[:split], cancelled)
+            if split:
+                seq = operations[split - 1]['seq']
+            else:
+                header = self._header()
+                seq = header[0] if header else 0
+
+            lines = [_base_line(seq, folded)]
+            lines += [json.dumps(operation) + '\n' for operation in operations[split:]]
+            atomic_write(self.path, ''.join(lines))
+
+    def _append(self, text: str):
+        if not os.path.exists(self.path):
+            atomic_write(self.path, _base_line(0, self._seed_values()))
+
+        header = self._header()
+
+        with open(self.path, 'rb+') as f:
+            _cut_torn_line(f, header[1] if header else 0)
+            f.write(text.encode())
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+
+        # Journals written before the header existed are compacted once to get one.
+        if header is None or size - header[1] > self.max_size:
+            self.compact()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return self._seed_values(), []
+
+        with open(self.path) as f:
+            base = json.loads(f.readline())['value']
+            lines = [line for line in f if line.strip()]
+
+        operations = []
+        for i, line in enumerate(lines):
+            try:
+                operations.append(json.loads(line))
+            except ValueError:
+                # Only the last line can be cut by a crash while appending.
+                if i < len(lines) - 1:
+                    raise
+
+        return base, operations
+
+    def _seed_values(self) -> Dict:
+        if self.seed and os.path.exists(self.seed):
+            return json.loads(Path(self.seed).read_text())
+        return dict(self.defaults)
+
+    def _header(self) -> Optional[tuple]:
+        """
+        The number of the last folded operation and the length of the first line.
+        """
+        with open(self.path, 'rb') as f:
+            match = _BASE_HEADER.match(f.read(128))
+
+        if match is None:
+            return None
+        return int(match.group(1)), match.end() + int(match.group(2)) + 2
+
+    def _last_seq(self) -> int:
+        """
+        The number of the last operation, read from the end of the journal only.
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        header = self._header()
+        if header is None:
+            _, operations = self._read()
+            return operations[-1]['seq'] if operations else 0
+
+        last, start = header
+
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            block = 4096
+            while size > start:
+                offset = max(size - block, start)
+                f.seek(offset)
+                lines = f.read().splitlines()
+                # The first line may be cut unless the read started after the first line.
+                for line in reversed(lines if offset == start else lines[1:]):
+                    try:
+                        return json.loads(line)['seq']
+                    except ValueError:
+                        continue
+                if offset == start:
+                    break
+                block *= 4
+
+        return last
+
+
+class SQLiteStore(Store):
+
+    """
+    One SQLite table per namespace, keyed by the primary key index.
+
+    Reading a key fetches one row and a prefix is a range scan of the
+    index, so nothing else is read. Values are stored as JSON text. The
+    `main` namespace holds the settings of `CLIConfig` and starts with its
+    defaults, the other namespaces start empty.
+
+    Parameters
+    ----------
+    namespace : str
+        The table of this store, a python identifier. Stores of several
+        namespaces can share one database file.
+    """
+
+    partial = True
+
+    def __init__(self, path: str, defaults: Dict, namespace: str = 'main'):
+        if not re.fullmatch(r'[A-Za-z_]\w*', namespace):
+            raise ValueError(f'Invalid config namespace: {namespace!r}')
+
+        super().__init__(path, defaults if namespace == 'main' else {})
+        self.namespace = namespace
+        self._db = None
+
+    def load(self) -> Dict:
+        db = self._connect(create=False)
+        if db is None:
+            return dict(self.defaults)
+
+        rows = db.execute(f'SELECT key, value FROM "{self.namespace}"')
+        return {key: json.loads(value) for key, value in rows}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        db = self._connect(create=False)
+        if db is None:
+            return self.defaults.get(key, default)
+
+        row = db.execute(f'SELECT value FROM "{self.namespace}" WHERE key = ?', (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def items(self, prefix: str = '') -> Dict:
+        db = self._connect(create=False)
+        if db is None:
+            return super().items(prefix)
+
+        query = f'SELECT key, value FROM "{self.namespace}"'
+        if prefix:
+            # A range on the primary key instead of LIKE, which can not use the index.
+            rows = db.execute(query + ' WHERE key >= ? AND key < ?', (prefix, _successor(prefix)))
+        else:
+            rows = db.execute(query)
+
+        return {key: json.loads(value) for key, value in rows}
+
+    def write(self, changes: Dict[str, Any]) -> None:
+        with self.lock(), self._connect() as db:
+            db.executemany(
+                f'DELETE FROM "{self.namespace}" WHERE key = ?',
+                [(key,) for key, value in changes.items() if value is REMOVED])
+            db.executemany(
+                f'INSERT OR REPLACE INTO "{self.namespace}" (key, value) VALUES (?, ?)',
+                [(key, json.dumps(value)) for key, value in changes.items() if value is not REMOVED])
+
+    def restore(self, values: Dict):
+        """
+        Write `values`, the table is not filled with the defaults when created.
+
+        The values are copied as they are, like the JSON file they come from.
+        """
+        with self.lock():
+            self._connect(seed=False)
+            self.write(values)
+
+    def _connect(self, create: bool = True, seed: bool = True) -> Optional[sqlite3.Connection]:
+        """
+        The database connection, `None` when reading a table not created yet.
+
+        Creating the table of the namespace fills it with the defaults, unless
+        `seed` is false.
+        """
+        if self._db is not None:
+            return self._db
+
+        if not create and not os.path.exists(self.path):
+            return None
+
+        db = sqlite3.connect(self.path, timeout=30)
+        found = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.namespace,)).fetchone()
+
+        if not found:
+            if not create:
+                db.close()
+                return None
+
+            with db:
+                db.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{self.namespace}" '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID')
+                db.executemany(
+                    f'INSERT OR IGNORE INTO "{self.namespace}" (key, value) VALUES (?, ?)',
+                    [(key, json.dumps(value)) for key, value in self.defaults.items() if seed])
+
+        self._db = db
+        return db
+
+
+def apply(values: Dict, changes: Dict[str, Any]):
+    for key, value in changes.items():
+        if value is REMOVED:
+            values.pop(key, None)
+        else:
+            values[key] = value
+
+
+def replay(base: Dict, operations: List[Dict]) -> Dict:
+    values = dict(base)
+    apply_operations(values, operations, _cancelled(operations))
+    return values
+
+
+def apply_operations(values: Dict, operations: List[Dict], cancelled: set):
+    for operation in operations:
+        if operation['seq'] in cancelled:
+            continue
+        if operation['op'] == 'set':
+            values[operation['key']] = operation['value']
+        elif operation['op'] == 'remove':
+            values.pop(operation['key'], None)
+
+
+def atomic_write(path: str, text: str):
+    """
+    Replace the file at `path` with `text`.
+
+    The content goes to a temporary file in the same folder first, it is
+    flushed to the disk and then renamed over the file, so a crash leaves
+    either the old or the new file, never a partial one.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', dir=folder)
+
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def migrate(source: Store, target: Store) -> int:
+    """
+    Copy every value of `source` into `target`, returns the number of keys.
+    """
+    values = source.load()
+    target.restore(values)
+    return len(values)
+
+
+def _base_line(seq: int, values: Dict) -> str:
+    text = json.dumps(values)
+    return f'{{"op": "base", "last": {seq}, "size": {len(text)}, "value": {text}}}\n'
+
+
+def _cut_torn_line(f, start: int):
+    """
+    Truncate the file `f` after its last complete line, and leave it at its end.
+
+    `start` is an offset known to be at the start of a line.
+    """
+    size = f.seek(0, os.SEEK_END)
+    if size <= start:
+        return
+
+    f.seek(size - 1)
+    if f.read(1) == b'\n':
+        return
+
+    end = start
+    block = 4096
+    while True:
+        offset = max(size - block, start)
+        f.seek(offset)
+        newline = f.read(size - offset).rfind(b'\n')
+        if newline >= 0:
+            end = offset + newline + 1
+            break
+        if offset == start:
+            break
+        block *= 4
+
+    f.truncate(end)
+    f.seek(end)
+
+
+def _successor(prefix: str) -> str:
+    """
+    The first string after every string starting with `prefix`.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _cancelled(operations: List[Dict]) -> set:
+    return {operation['target'] for operation in operations if operation['op'] == 'undo'}
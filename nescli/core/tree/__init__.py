@@ -0,0 +1,13 @@
+__all__ = [
+    'Node', 'Line', 'ListingCache', 'Stats', 'Walker', 'ArchiveWalker',
+    'walk', 'walk_archive', 'is_archive', 'render', 'totals', 'ndjson', 'json_array', 'html',
+]
+
+from .archive import ArchiveWalker, is_archive, walk_archive
+from .cache import ListingCache
+from .du import totals
+from .formats import html, json_array, ndjson
+from .node import Node
+from .render import Line, render
+from .stats import Stats
+from .walker import Walker, walk
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/archive.py
+# @Time    :   2026-10-19 03:02:51
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Walk the members of a zip or tar archive like a directory """
+
+import os
+import stat as st
+import tarfile
+import time
+import typing as t
+import zipfile
+from dataclasses import dataclass
+
+from .node import Node
+from .walker import Walker
+
+ZIP_SUFFIXES = ('.zip', '.whl', '.jar', '.egg')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# Listing records of each directory, by the member path of the directory.
+# A record is `(name, is_dir, is_link, target, stat)` like in the listing cache.
+_Index = t.Dict[str, t.Dict[str, tuple]]
+
+
+def is_archive(path: str) -> bool:
+    """
+    Whether `path` is a file with the suffix of a supported archive.
+    """
+    return os.path.isfile(path) and path.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+@dataclass
+class ArchiveWalker(Walker):
+
+    """
+    Walk the members of an archive as if it was extracted at its own path.
+
+    Zip files are read from their central directory and tar files with one
+    streaming pass over the member headers, no member data is read except
+    the target of zip links. The index built from them holds one record per
+    member, whatever the size of the archive.
+
+    Members get a `stat` with their size, mode and mtime. Directories only
+    present in member paths are added with an empty one. The listing options
+    of :class:`Walker` apply, `cache`, `jobs` and `follow_links` are ignored.
+    """
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.cache = None
+        self.jobs = 1
+        self.follow_links = False
+        self._index: _Index = {}
+        self._path = ''
+
+    def walk(self, path: str) -> t.Iterator[Node]:
+        self._index = read_index(path)
+        self._path = path
+        return super().walk(path)
+
+    def _root(self, path: str) -> Node:
+        return Node(os.path.basename(path), path, is_dir=True, stat=_stat(st.S_IFDIR | 0o755))
+
+    def list_dir(self, path: str, depth: int, anchor=None, visited=None) -> t.Tuple[t.List[Node], None]:
+        chain = self.matcher.enter(path, path) if self.matcher else None
+        member = path[len(self._path) + 1:].replace(os.sep, '/')
+        records = self._index.get(member, {}).values()
+        return self._select(_nodes(records, path, depth), chain, path, depth, None, visited), None
+
+
+def walk_archive(path: str, **options) -> t.Iterator[Node]:
+    """
+    Walk the archive at `path` and yield the nodes of its members in pre-order.
+
+    `options` are the attributes of :class:`Walker`.
+    """
+    return ArchiveWalker(**options).walk(path)
+
+
+def read_index(path: str) -> _Index:
+    """
+    Read the member list of the archive at `path` into directory listings.
+    """
+    index: _Index = {'': {}}
+
+    if path.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                _add(index, info.filename, *_zip_member(archive, info))
+        return index
+
+    # `r|*` reads the headers as one stream, member data is skipped on the way.
+    with tarfile.open(path, 'r|*') as archive:
+        info = archive.next()
+        while info is not None:
+            _add(index, info.name, info.isdir(), info.issym(), info.linkname if info.issym() else None,
+                 _stat(info.mode | _tar_type(info), info.size, info.mtime))
+            # `next` keeps every member to allow extraction later.
+            archive.members.clear()
+            info = archive.next()
+
+    return index
+
+
+def _zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> tuple:
+    mode = info.external_attr >> 16
+    if not st.S_IFMT(mode):
+        mode |= st.S_IFDIR | 0o755 if info.is_dir() else st.S_IFREG | 0o644
+
+    is_link = st.S_ISLNK(mode)
+    target = archive.read(info).decode('utf-8', 'replace') if is_link else None
+    mtime = time.mktime(info.date_time + (0, 0, -1))
+
+    return info.is_dir(), is_link, target, _stat(mode, info.file_size, mtime)
+
+
+def _tar_type(info: tarfile.TarInfo) -> int:
+    if info.isdir():
+        return st.S_IFDIR
+    return st.S_IFLNK if info.issym() else st.S_IFREG
+
+
+def _add(index: _Index, name: str, is_dir: bool, is_link: bool, target: t.Optional[str], stat: os.stat_result):
+    parts = [part for part in name.split('/') if part not in ('', '.')]
+    if not parts:
+        return
+
+    parent = ''
+    for part in parts[:-1]:
+        folder = f'{parent}/{part}' if parent else part
+        if folder not in index:
+            index[parent][part] = (part, True, False, None, _stat(st.S_IFDIR | 0o755))
+            index[folder] = {}
+        parent = folder
+
+    index[parent][parts[-1]] = (parts[-1], is_dir, is_link, target, stat)
+    if is_dir:
+        index.setdefault('/'.join(parts), {})
+
+
+def _nodes(records, path: str, depth: int) -> t.Iterator[Node]:
+    for name, is_dir, is_link, target, stat in records:
+        yield Node(name, os.path.join(path, name), depth,
+                   is_dir=is_dir, is_last=False, is_link=is_link, target=target, stat=stat)
+
+
+def _stat(mode: int, size: int = 0, mtime: float = 0) -> os.stat_result:
+    mtime_ns = int(mtime * 1e9)
+    return os.stat_result((mode, 0, 0, 1, 0, 0, size, mtime, mtime, mtime,
+                           float(mtime), float(mtime), float(mtime), mtime_ns, mtime_ns, mtime_ns))
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/cache.py
+# @Time    :   2026-10-18 22:05:48
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" On-disk cache of directory listings for the tree walker """
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import typing as t
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Listings of directories modified in the last few seconds are not stored:
+# an entry added within the same mtime tick would not change the mtime again.
+_SETTLE_NS = 2 * 10 ** 9
+
+_SUFFIX = '.pickle'
+_STATS_FILE = 'stats.json'
+
+# `(name, is_dir, is_link, target, stat)`, the walker stores no stat in the cache.
+Record = t.Tuple[str, bool, bool, t.Optional[str], t.Optional[os.stat_result]]
+
+
+def _cache_folder():
+    return os.path.join(os.environ['HOME'], '.nescli_tree_cache')
+
+
+class ListingCache:
+
+    """
+    Snapshot of the directory listings made by one walk.
+
+    A snapshot is stored for each root path and walker settings. A listing is
+    reused while the modification time of its directory is unchanged, so a
+    later walk only lists the directories which changed since.
+
+    The cache folder is kept under `max_size` bytes by removing the least
+    recently saved snapshots.
+    """
+
+    def __init__(self, folder: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.folder = folder or _cache_folder()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._key = None
+        self._old: t.Dict[str, t.Tuple[int, t.List[Record]]] = {}
+        self._fresh: t.Dict[str, t.Tuple[int, t.List[Record]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str):
+        """
+        Load the snapshot stored for `key`, an empty one if there is none.
+        """
+        self._key = hashlib.sha1(key.encode()).hexdigest()
+        self._fresh = {}
+
+        try:
+            with open(self._snapshot_file(), 'rb') as f:
+                self._old = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._old = {}
+
+    def get(self, path: str, mtime_ns: int) -> t.Optional[t.List[Record]]:
+        """
+        Return the cached listing of `path`, None when it is missing or outdated.
+        """
+        cached = self._old.get(path)
+
+        with self._lock:
+            if cached is None or cached[0] != mtime_ns:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._fresh[path] = cached
+
+        return cached[1]
+
+    def put(self, path: str, mtime_ns: int, records: t.List[Record]):
+        if time.time_ns() - mtime_ns < _SETTLE_NS:
+            return
+
+        with self._lock:
+            self._fresh[path] = (mtime_ns, records)
+
+    def save(self, complete: bool = True):
+        """
+        Write the snapshot back and update the statistics.
+
+        Directories which were not listed by a complete walk are dropped.
+        After an interrupted walk the old listings are kept as well.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+
+        listings = self._fresh if complete else {**self._old, **self._fresh}
+        _atomic_write(self._snapshot_file(), pickle.dumps(
+            listings, protocol=pickle.HIGHEST_PROTOCOL))
+
+        stats = self.stats()
+        _atomic_write(os.path.join(self.folder, _STATS_FILE), json.dumps(dict(
+            hits=stats['hits'] + self.hits,
+            misses=stats['misses'] + self.misses,
+        )).encode())
+
+        self._evict()
+
+    def stats(self) -> t.Dict[str, int]:
+        """
+        Statistics of all the walks which saved to this cache folder.
+        """
+        try:
+            with open(os.path.join(self.folder, _STATS_FILE)) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+
+        snapshots = self._snapshots()
+        return dict(
+            hits=stats.get('hits', 0),
+            misses=stats.get('misses', 0),
+            snapshots=len(snapshots),
+            size=sum(size for _, _, size in snapshots),
+        )
+
+    def _snapshot_file(self):
+        return os.path.join(self.folder, self._key + _SUFFIX)
+
+    def _snapshots(self) -> t.List[t.Tuple[float, str, int]]:
+        try:
+            names = os.listdir(self.folder)
+        except FileNotFoundError:
+            return []
+
+        snapshots = []
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            stat = os.stat(os.path.join(self.folder, name))
+            snapshots.append((stat.st_mtime, name, stat.st_size))
+
+        return snapshots
+
+    def _evict(self):
+        snapshots = sorted(self._snapshots())
+        total = sum(size for _, _, size in snapshots)
+
+        for _, name, size in snapshots:
+            if total <= self.max_size:
+                break
+            os.remove(os.path.join(self.folder, name))
+            total -= size
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/du.py
+# @Time    :   2026-10-18 23:31:09
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Hold back walker nodes until their disk usage totals are known """
+
+import typing as t
+
+from .node import Node
+
+_Item = t.Tuple[Node, list]
+
+
+def totals(nodes: t.Iterable[Node], by_size: bool = False) -> t.Iterator[Node]:
+    """
+    Yield the nodes of a `du` walk once the totals of their directories are final.
+
+    `nodes` are the nodes under the root. A top level directory is done when
+    the walker moves on to its next sibling, so only one top level subtree is
+    held back at a time. With `by_size` all the shown nodes are held back and
+    every directory lists its largest entries first.
+    """
+    if by_size:
+        yield from _sorted_preorder(nodes)
+        return
+
+    pending: t.List[Node] = []
+
+    for node in nodes:
+        if node.depth == 1:
+            yield from pending
+            pending.clear()
+        pending.append(node)
+
+    yield from pending
+
+
+def _sorted_preorder(nodes: t.Iterable[Node]) -> t.Iterator[Node]:
+    top: t.List[_Item] = []
+    stack = [top]
+
+    for node in nodes:
+        del stack[node.depth:]
+        children: t.List[_Item] = []
+        stack[-1].append((node, children))
+        stack.append(children)
+
+    pending = [iter(_by_usage(top))]
+
+    while pending:
+        item = next(pending[-1], None)
+        if item is None:
+            pending.pop()
+            continue
+
+        node, children = item
+        yield node
+        if children:
+            pending.append(iter(_by_usage(children)))
+
+
+def _by_usage(items: t.List[_Item]) -> t.List[_Item]:
+    items.sort(key=lambda item: item[0].usage, reverse=True)
+
+    for node, _ in items:
+        node.is_last = False
+    items[-1][0].is_last = True
+
+    return items
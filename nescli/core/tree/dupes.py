@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/dupes.py
+# @Time    :   2026-10-19 07:40:52
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Find files with the same content among walker nodes """
+
+import hashlib
+import os
+import typing as t
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .node import Node
+
+Group = namedtuple('Group', ['size', 'paths'])
+
+# Bytes read from each end of a file for the partial hash.
+BLOCK_SIZE = 4096
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def duplicates(nodes: t.Iterable[Node], workers: t.Optional[int] = None) -> t.List[Group]:
+    """
+    Group the regular files of `nodes` which have the same content.
+
+    Files are grouped by size first, from the stat of the walk, so a file
+    with a unique size is never read. Files of the same size are compared
+    by a hash of their first and last blocks, then the files still alike
+    get a full hash on a pool of `workers` threads. Hard links to the same
+    file count once. Empty and unreadable files are left out.
+
+    Returns the groups with the most reclaimable space first.
+    """
+    by_size: t.Dict[int, t.List[str]] = defaultdict(list)
+    seen: t.Set[t.Tuple[int, int]] = set()
+
+    for node in nodes:
+        if node.is_dir or node.is_link or node.omitted or not node.stat or not node.stat.st_size:
+            continue
+
+        inode = (node.stat.st_dev, node.stat.st_ino)
+        if node.stat.st_ino and inode in seen:
+            continue
+        seen.add(inode)
+
+        by_size[node.stat.st_size].append(node.path)
+
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+    groups: t.List[Group] = []
+    hashed: t.List[t.Tuple[int, t.List[str]]] = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        partial = _hashes(pool, partial_hash, [path for _, paths in candidates for path in paths])
+
+        for size, paths in candidates:
+            for alike in _group(paths, partial):
+                # Small files were read whole by the partial hash already.
+                if size <= 2 * BLOCK_SIZE:
+                    groups.append(Group(size, alike))
+                else:
+                    hashed.append((size, alike))
+
+        full = _hashes(pool, full_hash, [path for _, paths in hashed for path in paths])
+
+    for size, paths in hashed:
+        groups.extend(Group(size, same) for same in _group(paths, full))
+
+    groups.sort(key=lambda group: (-reclaimable(group), group.paths))
+    return groups
+
+
+def reclaimable(group: Group) -> int:
+    """
+    Bytes freed by keeping one file of `group` only.
+    """
+    return group.size * (len(group.paths) - 1)
+
+
+def partial_hash(path: str) -> t.Optional[bytes]:
+    """
+    Hash of the first and the last `BLOCK_SIZE` bytes of the file at `path`.
+    """
+    try:
+        with open(path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(BLOCK_SIZE))
+            if f.seek(0, os.SEEK_END) > BLOCK_SIZE:
+                f.seek(-min(BLOCK_SIZE, f.tell() - BLOCK_SIZE), os.SEEK_END)
+                digest.update(f.read(BLOCK_SIZE))
+            return digest.digest()
+    except OSError:
+        return None
+
+
+def full_hash(path: str) -> t.Optional[bytes]:
+    """
+    Hash of the whole content of the file at `path`.
+    """
+    digest = hashlib.blake2b()
+
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+
+    return digest.digest()
+
+
+def _hashes(pool: ThreadPoolExecutor, func, paths: t.List[str]) -> t.Dict[str, t.Optional[bytes]]:
+    return dict(zip(paths, pool.map(func, paths)))
+
+
+def _group(paths: t.List[str], digests: t.Dict[str, t.Optional[bytes]]) -> t.List[t.List[str]]:
+    """
+    The lists of `paths` with the same digest, unreadable files excepted.
+    """
+    alike: t.Dict[bytes, t.List[str]] = defaultdict(list)
+
+    for path in paths:
+        if digests[path] is not None:
+            alike[digests[path]].append(path)
+
+    return [same for same in alike.values() if len(same) > 1]
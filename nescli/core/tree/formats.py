@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/formats.py
+# @Time    :   2026-10-19 00:12:40
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Machine readable output for walker nodes """
+
+import json
+import typing as t
+from html import escape
+
+from .node import Node
+from .render import label
+
+
+def record(node: Node) -> t.Dict[str, t.Any]:
+    """
+    Describe one node with plain JSON types.
+
+    `size` and `mtime` are None when the walk did not collect stat results.
+    """
+    data = dict(
+        path=node.path,
+        type='link' if node.is_link else 'directory' if node.is_dir else 'file',
+        depth=node.depth,
+        size=node.size if node.size is not None else node.stat and node.stat.st_size,
+        mtime=node.stat and node.stat.st_mtime,
+    )
+
+    if node.omitted:
+        data['type'] = 'omitted'
+        data['count'] = node.omitted
+
+    if node.target:
+        data['target'] = node.target
+
+    if node.truncated:
+        data['truncated'] = True
+
+    if node.usage is not None:
+        data['usage'] = node.usage
+
+    if node.change:
+        data['change'] = node.change
+
+    if node.git:
+        data['git'] = node.git
+
+    return data
+
+
+def ndjson(nodes: t.Iterable[Node]) -> t.Iterator[str]:
+    """
+    Yield one JSON document per node, as soon as the node is received.
+    """
+    for node in nodes:
+        yield json.dumps(record(node), ensure_ascii=False)
+
+
+def json_array(nodes: t.Iterable[Node]) -> t.Iterator[str]:
+    """
+    Yield the chunks of a JSON array of records, one chunk per node.
+    """
+    sep = '[\n'
+
+    for line in ndjson(nodes):
+        yield sep + line
+        sep = ',\n'
+
+    yield '[]' if sep == '[\n' else '\n]'
+
+
+# Directories with more entries than this keep them in an inert `<template>`
+# until they are opened, so the browser does not lay out huge pages at once.
+LAZY_THRESHOLD = 1000
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font: 14px/1.5 monospace; }}
+ul {{ list-style: none; margin: 0; padding-left: 1.5em; }}
+summary, .dir {{ color: #1e5bbf; cursor: pointer; }}
+.link {{ color: #0f8a8a; }}
+.omitted {{ color: #888; }}
+</style>
+<script>
+document.addEventListener('toggle', function (event) {{
+    var template = event.target.querySelector(':scope > template');
+    if (event.target.open && template) template.replaceWith(template.content);
+}}, true);
+</script>
+</head>
+<body>
+<h1>{title}</h1>
+<ul>
+"""
+
+_HTML_TAIL = """</ul>
+</body>
+</html>
+"""
+
+
+def html(nodes: t.Iterable[Node], title: str = '', lazy_threshold: int = LAZY_THRESHOLD) -> t.Iterator[str]:
+    """
+    Yield the chunks of a self-contained HTML page, one chunk per node.
+
+    Directories are collapsible `<details>` elements, the root one is open.
+    Only the directories still open on the current branch are remembered.
+
+    The label of the root is updated by a script at the end of the page when
+    it changed during the walk, as the `du` total of the root is only known
+    once every other node was written.
+    """
+    yield _HTML_HEAD.format(title=escape(title))
+
+    # Whether each open directory keeps its entries in a template.
+    lazy: t.List[bool] = []
+    root = root_label = None
+
+    for node in nodes:
+        while len(lazy) > node.depth:
+            yield _html_close(lazy.pop())
+
+        text = escape(label(node))
+
+        if node.depth == 0:
+            root, root_label = node, label(node)
+
+        if not node.has_children:
+            yield f'<li class="{_html_class(node)}">{text}</li>\n'
+            continue
+
+        lazy.append(node.entries > lazy_threshold)
+        is_open = ' open' if node.depth == 0 else ''
+        yield (f'<li><details{is_open}><summary>{text}</summary>'
+               + ('<template>' if lazy[-1] else '') + '<ul>\n')
+
+    while lazy:
+        yield _html_close(lazy.pop())
+
+    if root is not None and label(root) != root_label:
+        text = json.dumps(label(root)).replace('</', '<\\/')
+        yield f'<script>document.querySelector("summary").textContent = {text};</script>\n'
+
+    yield _HTML_TAIL
+
+
+def _html_close(lazy: bool) -> str:
+    return '</ul>' + ('</template>' if lazy else '') + '</details></li>\n'
+
+
+def _html_class(node: Node) -> str:
+    if node.omitted:
+        return 'omitted'
+    if node.is_link:
+        return 'link'
+    return 'dir' if node.is_dir else 'file'
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/gitstatus.py
+# @Time    :   2026-10-19 06:32:05
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Git status of walker nodes from one `git status` call """
+
+import os
+import subprocess
+import typing as t
+
+from .node import Node
+
+CONFLICT, MODIFIED, STAGED, UNTRACKED, IGNORED = 'U', 'M', 'S', '?', '!'
+
+# A directory shows the first of these found among its descendants.
+PRIORITY = (CONFLICT, MODIFIED, STAGED, UNTRACKED, IGNORED)
+
+_RANK = {status: rank for rank, status in enumerate(PRIORITY)}
+
+
+class GitStatus:
+
+    """
+    Path to status lookup for the entries of a git work tree.
+
+    Files get one of `PRIORITY`: a conflict, changes not staged, staged
+    changes, untracked or ignored. Every directory above a file gets the
+    most important status found below it, ignored entries excepted. Git
+    reports whole untracked or ignored directories with one entry, their
+    content gets the same status.
+
+    Parameters
+    ----------
+    root : str
+        The walked directory, inside the work tree which starts at `top`.
+    top : str
+        The top level directory of the work tree, git paths are relative to it.
+    """
+
+    def __init__(self, root: str, top: str):
+        self.root = root
+        self.top = top
+        self._statuses: t.Dict[str, str] = {}
+        self._whole: t.Set[str] = set()
+
+    @classmethod
+    def read(cls, root: str) -> t.Optional['GitStatus']:
+        """
+        Run `git status` once for `root`, returns `None` outside of a work tree.
+        """
+        top = find_top(root)
+        if top is None:
+            return None
+
+        try:
+            result = subprocess.run(
+                ['git', 'status', '--porcelain=v2', '-z', '--ignored', '--', '.'],
+                cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+        status = cls(root, top)
+        status.parse(result.stdout)
+        return status
+
+    def parse(self, output: bytes):
+        """
+        Load the output of `git status --porcelain=v2 -z`.
+        """
+        records = iter(output.split(b'\0'))
+
+        for record in records:
+            if not record:
+                continue
+
+            kind = record[:1]
+            if kind == b'1':
+                self._add(record.split(b' ', 8)[8], _change(record[2:4]))
+            elif kind == b'2':
+                self._add(record.split(b' ', 9)[9], _change(record[2:4]))
+                # The original path of a rename comes as the next record.
+                next(records, None)
+            elif kind == b'u':
+                self._add(record.split(b' ', 10)[10], CONFLICT)
+            elif kind in (b'?', b'!'):
+                self._add(record[2:], UNTRACKED if kind == b'?' else IGNORED)
+
+    def get(self, path: str) -> t.Optional[str]:
+        """
+        The status of the file or directory at `path`, `None` when unchanged.
+        """
+        return self._statuses.get(path)
+
+    def annotate(self, nodes: t.Iterable[Node]) -> t.Iterator[Node]:
+        """
+        Yield `nodes` with their `git` status set, one lookup per node.
+
+        Entries of a directory git reported as a whole inherit its status.
+        """
+        # The status each depth passes to its entries, the root may be missing.
+        inherited: t.List[t.Optional[str]] = []
+
+        for node in nodes:
+            del inherited[node.depth:]
+            inherited.extend([None] * (node.depth - len(inherited)))
+            parent = inherited[-1] if inherited else None
+
+            node.git = parent or self.get(node.path)
+            inherited.append(node.git if parent or node.path in self._whole else None)
+
+            yield node
+
+    def _add(self, raw: bytes, status: str):
+        relpath = os.fsdecode(raw)
+        whole = relpath.endswith('/')
+        path = os.path.join(self.top, *relpath.rstrip('/').split('/'))
+
+        if whole:
+            self._whole.add(path)
+
+        if status == IGNORED:
+            self._statuses.setdefault(path, status)
+            return
+
+        while len(path) >= len(self.root):
+            current = self._statuses.get(path)
+            if current is not None and _RANK[current] <= _RANK[status]:
+                break
+            self._statuses[path] = status
+            path = os.path.dirname(path)
+
+
+def find_top(path: str) -> t.Optional[str]:
+    """
+    The closest directory from `path` up which holds a `.git` entry.
+    """
+    path = os.path.abspath(path)
+
+    while True:
+        if os.path.exists(os.path.join(path, '.git')):
+            return path
+
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _change(xy: bytes) -> str:
+    if xy[1:2] != b'.':
+        return MODIFIED
+    return STAGED
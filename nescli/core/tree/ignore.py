@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/ignore.py
+# @Time    :   2026-10-18 22:48:16
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" `.gitignore` style pattern matching for the tree walker """
+
+from collections import namedtuple
+import os
+import re
+import typing as t
+
+from .node import Node
+
+GITIGNORE = '.gitignore'
+
+Rule = namedtuple('Rule', ['regex', 'negate', 'dir_only'])
+
+
+class Rules:
+
+    """
+    Patterns of one `.gitignore` file, compiled once.
+
+    All the patterns are also joined into a single regex, so a path which
+    matches none of them is rejected with one regex call.
+    """
+
+    def __init__(self, patterns: t.Iterable[str]):
+        self.rules = [rule for rule in map(compile_pattern, patterns) if rule]
+        self._any = re.compile('|'.join(
+            f'(?:{rule.regex.pattern})' for rule in self.rules) or '(?!)')
+
+    def __bool__(self):
+        return len(self.rules) > 0
+
+    def match(self, relpath: str, is_dir: bool) -> t.Optional[bool]:
+        """
+        True if `relpath` is ignored, False if it is re-included by a `!` pattern,
+        None if no pattern matches. The last matching pattern wins.
+        """
+        if not self._any.fullmatch(relpath):
+            return None
+
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.fullmatch(relpath):
+                return not rule.negate
+
+        return None
+
+
+Chain = t.List[t.Tuple[str, Rules]]
+
+
+class Matcher:
+
+    """
+    Decide which entries the walker prunes.
+
+    `.gitignore` files are read while their directory is listed and apply to
+    everything below it, deeper files take precedence. `exclude` patterns
+    behave like a `.gitignore` file at the root of the walk. When `include`
+    patterns are given, only the files matching one of them are kept.
+    """
+
+    def __init__(self, gitignore: bool = False, exclude: t.Iterable[str] = (), include: t.Iterable[str] = ()):
+        self.gitignore = gitignore
+        self.exclude = Rules(exclude)
+        self.include = Rules(include)
+        self.root = None
+        self._chains: t.Dict[str, Chain] = {}
+
+    def reset(self, root: str):
+        """
+        Start a walk at `root`. Only directories with their own rules are remembered.
+        """
+        self.root = root
+        self._chains = {os.path.dirname(root): [(root, self.exclude)] if self.exclude else []}
+
+    def enter(self, path: str, target: t.Union[str, int]) -> Chain:
+        """
+        Load the rules of the directory at `path` before its entries are read.
+
+        `target` is the path or an open descriptor of the directory.
+        Returns the rules which apply to its entries, deepest last.
+        """
+        parent = os.path.dirname(path)
+        while parent not in self._chains:
+            parent = os.path.dirname(parent)
+        chain = self._chains[parent]
+
+        if self.gitignore:
+            rules = Rules(_read_lines(target, path))
+            if rules:
+                chain = chain + [(path, rules)]
+                self._chains[path] = chain
+
+        return chain
+
+    def ignored(self, node: Node, chain: Chain) -> bool:
+        if self.gitignore and node.name == '.git':
+            return True
+
+        for base, rules in reversed(chain):
+            result = rules.match(_relative(node.path, base), node.is_dir)
+            if result is not None:
+                return result
+
+        if self.include and not node.is_dir:
+            return not self.include.match(_relative(node.path, self.root), False)
+
+        return False
+
+
+def compile_pattern(pattern: str) -> t.Optional[Rule]:
+    """
+    Compile one line of a `.gitignore` file, None for blank lines and comments.
+    """
+    pattern = pattern.rstrip('\n')
+
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    while pattern.endswith(' ') and not pattern.endswith('\\ '):
+        pattern = pattern[:-1]
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern[:2] in ('\\!', '\\#'):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+
+    if not pattern:
+        return None
+
+    anchored = '/' in pattern
+    regex = translate(pattern.lstrip('/'))
+
+    if not anchored:
+        regex = '(?:.*/)?' + regex
+
+    return Rule(re.compile(regex), negate, dir_only)
+
+
+def translate(pattern: str) -> str:
+    """
+    Translate a glob pattern with `**` support to a regex matching relative paths.
+    """
+    i, n = 0, len(pattern)
+    out = []
+
+    while i < n:
+        if pattern.startswith('**/', i) and (i == 0 or pattern[i - 1] == '/'):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+
+        if pattern.startswith('/**', i) and i + 3 == n:
+            out.append('/.*')
+            i += 3
+            continue
+
+        c = pattern[i]
+        i += 1
+
+        if c == '*':
+            while i < n and pattern[i] == '*':
+                i += 1
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+                continue
+            body = pattern[i:end].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append(f'[{body}]')
+            i = end + 1
+        elif c == '\\' and i < n:
+            out.append(re.escape(pattern[i]))
+            i += 1
+        else:
+            out.append(re.escape(c))
+
+    return ''.join(out)
+
+
+def _read_lines(target: t.Union[str, int], path: str) -> t.List[str]:
+    try:
+        if isinstance(target, int):
+            fd = os.open(GITIGNORE, os.O_RDONLY, dir_fd=target)
+            with open(fd, encoding='utf-8', errors='replace') as f:
+                return f.readlines()
+
+        with open(os.path.join(path, GITIGNORE), encoding='utf-8', errors='replace') as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+def _relative(path: str, base: str) -> str:
+    return path[len(base.rstrip(os.sep)) + 1:]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/lister.py
+# @Time    :   2026-10-18 21:14:05
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Strategies used by the walker to list directories """
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+import typing as t
+
+from .node import Node
+
+_Level = namedtuple('_Level', ['dirs', 'anchor', 'futures'])
+
+
+class Lister:
+
+    """
+    List directories one at a time, when the walker descends into them.
+
+    The walker calls `push` after entering a directory, `take` to get the
+    listing of one of its children and `pop` before leaving it, so a lister
+    always knows which directories are coming next. `visited` holds the
+    directories entered by the walk, passed on to `Walker.list_dir`.
+    """
+
+    def __init__(self, walker, visited=None):
+        self.walker = walker
+        self.visited = visited
+
+    def push(self, children: t.List[Node], anchor):
+        pass
+
+    def take(self, node: Node, anchor):
+        return self.walker.list_dir(node.path, node.depth + 1, anchor, self.visited)
+
+    def pop(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ParallelLister(Lister):
+
+    """
+    List the next sibling directories ahead of the walk on a thread pool.
+
+    The listings are still consumed in walk order, so the output is the same
+    as with :class:`Lister`. At most `window` listings are kept ahead for each
+    directory on the current branch.
+    """
+
+    def __init__(self, walker, jobs: int, window: int = None, visited=None):
+        super().__init__(walker, visited)
+        self._pool = ThreadPoolExecutor(max_workers=jobs)
+        self._window = window or jobs * 4
+        self._levels: t.List[_Level] = []
+
+    def push(self, children: t.List[Node], anchor):
+        dirs = iter([node for node in children if self.walker.descends(node)])
+        level = _Level(dirs, anchor, {})
+        self._levels.append(level)
+        self._fill(level)
+
+    def take(self, node: Node, anchor):
+        level = self._levels[-1]
+        future = level.futures.pop(node.path, None)
+        self._fill(level)
+
+        if future is None:
+            return super().take(node, anchor)
+
+        return future.result()
+
+    def pop(self):
+        _discard(self._levels.pop())
+
+    def close(self):
+        while self._levels:
+            _discard(self._levels.pop())
+        self._pool.shutdown()
+
+    def _fill(self, level: _Level):
+        while len(level.futures) < self._window:
+            node = next(level.dirs, None)
+            if node is None:
+                return
+
+            level.futures[node.path] = self._pool.submit(
+                self.walker.list_dir, node.path, node.depth + 1, level.anchor, self.visited)
+
+
+def _discard(level: _Level):
+    """
+    Drop the listings which were never taken.
+
+    They may still be using the anchor of the level, so wait for them
+    before the walker closes it, and close the anchors they opened.
+    """
+    for future in level.futures.values():
+        if future.cancel():
+            continue
+
+        try:
+            _, anchor = future.result()
+        except OSError:
+            continue
+
+        if anchor is not None:
+            os.close(anchor.fd)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/node.py
+# @Time    :   2026-10-18 19:52:10
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Node model shared by the tree walker and renderers """
+
+from dataclasses import dataclass, field
+import os
+import typing as t
+
+
+@dataclass
+class Node:
+
+    """
+    A single entry yielded by the walker.
+
+    Nodes are yielded in pre-order, the root directory comes first with depth `0`.
+    `is_last` and `has_children` are filled with a look-ahead of one entry,
+    so a renderer can finish the line as soon as it receives the node.
+
+    `target` is the value of the link for symbolic links, or the path of the
+    first visit for a directory which is reached twice while following links.
+    `stat` is only filled when the walker needs it. `size` and `usage` are the
+    apparent size and the disk usage in bytes, totals for directories.
+    `entries` is the number of entries listed in a directory the walker
+    entered, a placeholder counts as one.
+
+    A node with `omitted` set is a placeholder for that many entries of its
+    directory which were left out. `truncated` directories were not listed
+    because the walk ran out of time. `change` is the status of the node in
+    a snapshot diff, `+`, `-` or `~`, and `git` its status in a git work tree.
+    """
+
+    name: str
+    path: str
+    depth: int = 0
+    is_dir: bool = False
+    is_last: bool = True
+    has_children: bool = False
+    entries: int = 0
+    is_link: bool = False
+    target: t.Optional[str] = None
+    stat: t.Optional[os.stat_result] = field(default=None, repr=False)
+    size: t.Optional[int] = None
+    usage: t.Optional[int] = None
+    omitted: int = 0
+    truncated: bool = False
+    change: t.Optional[str] = None
+    git: t.Optional[str] = None
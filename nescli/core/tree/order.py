@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/order.py
+# @Time    :   2026-10-19 01:12:47
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Sort keys for the entries of one directory """
+
+import os
+import re
+import typing as t
+
+from .node import Node
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def name_key(node: Node) -> tuple:
+    """
+    Case insensitive name, the exact name breaks ties so the order is stable.
+    """
+    return node.name.casefold(), node.name
+
+
+def natural_key(node: Node) -> tuple:
+    """
+    Name where every run of digits compares as a number, `file2` before `file10`.
+
+    Does not depend on the locale.
+    """
+    # Splitting on a capturing group puts text at even and digits at odd
+    # positions, so two keys always compare `str` to `str` and `int` to `int`.
+    parts = _DIGITS.split(node.name.casefold())
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts)), node.name
+
+
+def size_key(node: Node) -> tuple:
+    return node.stat.st_size, name_key(node)
+
+
+def mtime_key(node: Node) -> tuple:
+    return node.stat.st_mtime_ns, name_key(node)
+
+
+def ext_key(node: Node) -> tuple:
+    return os.path.splitext(node.name)[1].casefold(), name_key(node)
+
+
+KEYS: t.Dict[str, t.Callable[[Node], tuple]] = {
+    'name': name_key,
+    'natural': natural_key,
+    'size': size_key,
+    'mtime': mtime_key,
+    'ext': ext_key,
+}
+
+# Sort keys reading `Node.stat`.
+STAT_KEYS = ('size', 'mtime')
+
+
+def arrange(nodes: t.Iterable[Node], sort: t.Optional[str] = None,
+            dirs_first: bool = False, reverse: bool = False) -> t.List[Node]:
+    """
+    Order the entries of one directory.
+
+    Parameters
+    ----------
+    nodes : Iterable[Node]
+        The entries, `stat` must be set for the keys in `STAT_KEYS`.
+    sort : str
+        One of `KEYS`, `None` keeps the listing order.
+    dirs_first : bool
+        Put directories before the other entries, whatever `reverse` is.
+    reverse : bool
+        Reverse the order given by `sort`.
+    """
+    nodes = list(nodes)
+
+    if sort is not None:
+        nodes.sort(key=KEYS[sort], reverse=reverse)
+    elif reverse:
+        nodes.reverse()
+
+    if dirs_first:
+        nodes.sort(key=lambda node: not node.is_dir)
+
+    return nodes
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/render.py
+# @Time    :   2026-10-18 20:31:47
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Turn walker nodes into box-drawing lines """
+
+from collections import namedtuple
+import typing as t
+
+from utils.strutil import TabChar, human_size
+
+from .node import Node
+
+Line = namedtuple('Line', ['content', 'fg'], defaults=["", 'white'])
+
+_CHANGE_COLORS = {'+': 'green', '-': 'red', '~': 'yellow'}
+_GIT_COLORS = {'U': 'magenta', 'M': 'yellow', 'S': 'green', '?': 'red', '!': 'bright_black'}
+
+
+def render(nodes: t.Iterable[Node]) -> t.Iterator[Line]:
+    """
+    Yield one line for each node as soon as the node is received.
+
+    The only state kept is whether each ancestor has more siblings,
+    so memory grows with the depth of the tree instead of its size.
+    """
+    pipes: t.List[str] = []
+
+    for node in nodes:
+        if node.depth == 0:
+            yield Line(TabChar.CORNER_TOP_LEFT + node.name, fg='blue')
+            continue
+
+        del pipes[node.depth - 1:]
+        yield Line(_prefix(pipes, node) + label(node), fg=_color(node))
+        pipes.append('  ' if node.is_last else TabChar.PIPE + ' ')
+
+
+def _prefix(pipes: t.List[str], node: Node) -> str:
+    indent = ''.join(pipes)
+    branch = TabChar.CORNER_BOTTOM_LEFT if node.is_last else TabChar.BRANCH_LEFT
+    head = TabChar.BRANCH_TOP if node.has_children else TabChar.INDENT
+    return indent + branch + TabChar.INDENT + head
+
+
+def label(node: Node) -> str:
+    """
+    The text shown for `node` after its branch, without colors.
+    """
+    label = node.name
+
+    if node.omitted:
+        label = f'… {node.omitted:,} more'
+
+    if node.target:
+        label = f'{label} -> {node.target}'
+
+    if node.truncated:
+        label = f'{label} [truncated]'
+
+    if node.usage is not None:
+        label = f'[{human_size(node.usage):>6}] {label}'
+
+    if node.change:
+        label = f'{node.change} {label}'
+
+    if node.git:
+        label = f'{label} [{node.git}]'
+
+    return label
+
+
+def _color(node: Node) -> str:
+    if node.change:
+        return _CHANGE_COLORS[node.change]
+    if node.git:
+        return _GIT_COLORS[node.git]
+    if node.omitted or node.truncated:
+        return 'bright_black'
+    if node.is_link:
+        return 'cyan'
+    return 'blue' if node.is_dir else 'white'
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/snapshot.py
+# @Time    :   2026-10-19 05:20:14
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Save a walk to a compact file and compare it with a later walk """
+
+import gzip
+import os
+import struct
+import typing as t
+from collections import namedtuple
+
+from .node import Node
+
+MAGIC = b'NESTREE1'
+
+# Length of the path prefix shared with the previous record, length of the
+# rest of the path, kind, size and mtime in nanoseconds.
+_RECORD = struct.Struct('<IIBQq')
+
+# Records written or read at a time.
+_BATCH = 4096
+_CHUNK = 256 * 1024
+
+_KINDS = {'file': 0, 'directory': 1, 'link': 2}
+_NAMES = {value: key for key, value in _KINDS.items()}
+
+Entry = namedtuple('Entry', ['path', 'kind', 'size', 'mtime_ns'])
+Change = namedtuple('Change', ['status', 'entry'])
+
+ADDED, REMOVED, MODIFIED = '+', '-', '~'
+
+
+def entries(nodes: t.Iterable[Node]) -> t.Iterator[Entry]:
+    """
+    Describe the nodes under the root with paths relative to it.
+
+    The walk must sort by `name` and collect stat results, so the entries
+    come in the order `diff` expects.
+    """
+    root = None
+
+    for node in nodes:
+        if node.depth == 0:
+            root = node.path
+            continue
+        if node.omitted:
+            continue
+
+        kind = 'link' if node.is_link else 'directory' if node.is_dir else 'file'
+        path = node.path[len(root) + 1:].replace(os.sep, '/')
+        yield Entry(path, kind, node.stat.st_size, node.stat.st_mtime_ns)
+
+
+def save(path: str, items: t.Iterable[Entry]) -> int:
+    """
+    Write `items` to the snapshot file at `path`, returns the number written.
+
+    Each path only stores what differs from the previous one, and the
+    records are compressed with gzip.
+    """
+    count = 0
+    previous = b''
+    parts = [MAGIC]
+
+    with gzip.open(path, 'wb', compresslevel=1) as f:
+        for entry in items:
+            encoded = os.fsencode(entry.path)
+            shared = _shared(previous, encoded)
+            parts.append(_RECORD.pack(shared, len(encoded) - shared,
+                                      _KINDS[entry.kind], entry.size, entry.mtime_ns))
+            parts.append(encoded[shared:])
+            previous = encoded
+            count += 1
+
+            if len(parts) >= _BATCH:
+                f.write(b''.join(parts))
+                parts.clear()
+
+        f.write(b''.join(parts))
+
+    return count
+
+
+def load(path: str) -> t.Iterator[Entry]:
+    """
+    Read the entries of the snapshot file at `path` one at a time.
+    """
+    previous = b''
+
+    with gzip.open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path!r} is not a tree snapshot.')
+
+        buffer, pos = b'', 0
+        while True:
+            if len(buffer) - pos < _RECORD.size:
+                buffer, pos = buffer[pos:] + f.read(_CHUNK), 0
+                if not buffer:
+                    return
+
+            shared, length, kind, size, mtime_ns = _unpack(buffer, pos, path)
+            pos += _RECORD.size
+
+            if len(buffer) - pos < length:
+                buffer, pos = buffer[pos:] + f.read(max(_CHUNK, length)), 0
+
+            previous = previous[:shared] + buffer[pos:pos + length]
+            pos += length
+            yield Entry(os.fsdecode(previous), _NAMES[kind], size, mtime_ns)
+
+
+def diff(old: t.Iterable[Entry], new: t.Iterable[Entry]) -> t.Iterator[Change]:
+    """
+    Compare two sorted entry streams in one pass.
+
+    Files and links are modified when their kind, size or mtime changed.
+    Directories are only modified when their kind changed, the changes of
+    their entries are reported for the entries themselves.
+    """
+    old, new = _keyed(old), _keyed(new)
+    a, b = next(old, None), next(new, None)
+
+    while a is not None or b is not None:
+        if b is None or (a is not None and a[0] < b[0]):
+            yield Change(REMOVED, a[1])
+            a = next(old, None)
+        elif a is None or b[0] < a[0]:
+            yield Change(ADDED, b[1])
+            b = next(new, None)
+        else:
+            if _modified(a[1], b[1]):
+                yield Change(MODIFIED, b[1])
+            a, b = next(old, None), next(new, None)
+
+
+def nodes(changes: t.Iterable[Change], root: str) -> t.List[Node]:
+    """
+    Build the nodes to render `changes` under `root`, in pre-order.
+
+    The directories leading to a change are added without a status.
+    """
+    result = [Node(os.path.basename(root), root, is_dir=True)]
+    shown: t.List[str] = []
+
+    for status, entry in changes:
+        parts = entry.path.split('/')
+        common = 0
+        while common < min(len(shown), len(parts) - 1) and shown[common] == parts[common]:
+            common += 1
+        del shown[common:]
+
+        for depth in range(common, len(parts) - 1):
+            shown.append(parts[depth])
+            result.append(Node(parts[depth], os.path.join(root, *parts[:depth + 1]), depth + 1, is_dir=True))
+
+        result.append(Node(parts[-1], os.path.join(root, *parts), len(parts),
+                           is_dir=entry.kind == 'directory', is_link=entry.kind == 'link',
+                           change=status))
+        if entry.kind == 'directory':
+            shown.append(parts[-1])
+
+    _link(result)
+    return result
+
+
+def order_key(path: str) -> tuple:
+    """
+    Key of a relative path in the pre-order of a walk sorted by `name`.
+    """
+    return tuple((part.casefold(), part) for part in path.split('/'))
+
+
+def _keyed(items: t.Iterable[Entry]) -> t.Iterator[t.Tuple[tuple, Entry]]:
+    # Entries of one directory come together, so the key of their parent
+    # is only computed once per directory.
+    parent, parent_key = None, ()
+
+    for entry in items:
+        head, _, name = entry.path.rpartition('/')
+        if head != parent:
+            parent, parent_key = head, order_key(head) if head else ()
+        yield parent_key + ((name.casefold(), name),), entry
+
+
+def _unpack(buffer: bytes, pos: int, path: str) -> tuple:
+    try:
+        return _RECORD.unpack_from(buffer, pos)
+    except struct.error:
+        raise ValueError(f'{path!r} is truncated.')
+
+
+def _modified(a: Entry, b: Entry) -> bool:
+    if a.kind != b.kind:
+        return True
+    return a.kind != 'directory' and (a.size, a.mtime_ns) != (b.size, b.mtime_ns)
+
+
+def _shared(a: bytes, b: bytes) -> int:
+    # Most paths share their whole directory with the previous one, the
+    # rest of a name is left to gzip.
+    head = b[:b.rfind(b'/') + 1]
+    if a.startswith(head):
+        return len(head)
+
+    # Binary search on slice comparisons, which run in C.
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _link(result: t.List[Node]):
+    """
+    Fill `is_last` and `has_children` of nodes already in pre-order.
+    """
+    later: t.List[bool] = [False] * (max(node.depth for node in result) + 2)
+
+    for i in range(len(result) - 1, -1, -1):
+        node = result[i]
+        node.is_last = not later[node.depth]
+        node.has_children = i + 1 < len(result) and result[i + 1].depth > node.depth
+        later[node.depth] = True
+        later[node.depth + 1:] = [False] * (len(later) - node.depth - 1)
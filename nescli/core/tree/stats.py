@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/stats.py
+# @Time    :   2026-10-19 02:06:18
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Count walker nodes per entry type and per extension """
+
+import os
+import typing as t
+from collections import Counter
+
+from .node import Node
+
+NO_EXTENSION = '(none)'
+
+
+class Stats:
+
+    """
+    Counts and byte totals of the nodes going through `count`.
+
+    Entry types are `directory`, `empty directory`, `file` and `link`, an
+    empty directory is one the walk listed and found nothing to show in.
+    Extensions are counted for files only. Bytes come from `Node.stat` when
+    the walk collected it, nodes without a stat add no bytes.
+
+    Parameters
+    ----------
+    sized : bool
+        Whether the walk stats every entry, it depends on the walk options
+        and not on the nodes since some walks only stat directories.
+
+    Attributes
+    ----------
+    max_depth : int
+        The `max_depth` of the walk, directories below it are not listed
+        so they are never counted as empty.
+    types : Counter
+        Number of entries per type.
+    type_bytes : Counter
+        Bytes per type.
+    extensions : Counter
+        Number of files per lower case extension.
+    extension_bytes : Counter
+        Bytes per extension.
+    omitted : int
+        Entries left out by `max_entries`, they have no type.
+    sized : bool
+        Whether the byte totals are known.
+    """
+
+    def __init__(self, max_depth: int = 0, sized: bool = False):
+        self.max_depth = max_depth
+        self.types = Counter()
+        self.type_bytes = Counter()
+        self.extensions = Counter()
+        self.extension_bytes = Counter()
+        self.omitted = 0
+        self.sized = sized
+
+    def count(self, nodes: t.Iterable[Node]) -> t.Iterator[Node]:
+        """
+        Yield `nodes` unchanged, counting every node below the root on the way.
+
+        `nodes` must be in pre-order, an empty directory is only known when
+        the node after it is not one of its children.
+        """
+        listed: t.Optional[Node] = None
+
+        for node in nodes:
+            if listed is not None and node.depth <= listed.depth:
+                self._empty(listed)
+            listed = node if self._listed(node) else None
+
+            if node.depth > 0:
+                self.add(node)
+
+            yield node
+
+        if listed is not None:
+            self._empty(listed)
+
+    def add(self, node: Node):
+        if node.omitted:
+            self.omitted += node.omitted
+            return
+
+        size = node.stat.st_size if node.stat is not None else 0
+        kind = _kind(node)
+
+        self.types[kind] += 1
+        self.type_bytes[kind] += size
+
+        if kind == 'file':
+            extension = os.path.splitext(node.name)[1].lower() or NO_EXTENSION
+            self.extensions[extension] += 1
+            self.extension_bytes[extension] += size
+
+    def _listed(self, node: Node) -> bool:
+        return (node.depth > 0 and node.is_dir and not node.is_link and not node.truncated
+                and (self.max_depth <= 0 or node.depth <= self.max_depth))
+
+    def _empty(self, node: Node):
+        size = node.stat.st_size if node.stat is not None else 0
+        self.types['directory'] -= 1
+        self.type_bytes['directory'] -= size
+        self.types['empty directory'] += 1
+        self.type_bytes['empty directory'] += size
+
+
+def _kind(node: Node) -> str:
+    if node.is_link:
+        return 'link'
+    return 'directory' if node.is_dir else 'file'
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/walker.py
+# @Time    :   2026-10-18 19:55:32
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Single pass directory walker based on `os.scandir` """
+
+import itertools
+import os
+import time
+import typing as t
+from collections import namedtuple
+from dataclasses import dataclass, field, fields
+
+from .cache import ListingCache
+from .ignore import Matcher
+from .lister import Lister, ParallelLister
+from .node import Node
+from .order import STAT_KEYS, arrange
+
+# Directories whose path gets longer than this (in bytes) are kept open and
+# their children are opened relative to them, so the walker never passes a
+# path longer than `PATH_MAX` to the kernel on very deep trees.
+_ANCHOR_LENGTH = 2048
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+_Anchor = namedtuple('_Anchor', ['fd', 'path'])
+_Frame = namedtuple('_Frame', ['node', 'entries', 'anchor', 'owned'])
+
+# Walker attributes which do not change the listings.
+_UNKEYED = ('jobs', 'cache', 'time_budget', 'dirs_first', 'reverse')
+
+
+@dataclass
+class Walker:
+
+    """
+    Walk a directory and yield its nodes in pre-order.
+
+    Every directory is listed once with `os.scandir`, the entry types come
+    from the cached `DirEntry` information so no extra `stat` calls are made.
+
+    The traversal uses an explicit stack instead of recursion, so any depth
+    can be walked. Only the listings of the directories on the current branch
+    are kept in memory.
+
+    Attributes
+    ----------
+    max_depth : int
+        Recursion depth to walk, `0` means no limit.
+    show_hidden : bool
+        Keep hidden files and python dunder folders.
+    follow_links : bool
+        Descend into symbolic links to directories. Every directory reached
+        twice is yielded with its `target` set and is not walked again,
+        so link loops are safe.
+    jobs : int
+        Number of threads listing directories ahead of the walk. The output
+        order does not depend on it.
+    cache : ListingCache
+        Reuse the listings of directories which did not change since the
+        last walk with the same settings.
+    gitignore : bool
+        Prune the entries ignored by the `.gitignore` files found on the way.
+    exclude : Tuple[str]
+        `.gitignore` style patterns of entries to prune.
+    include : Tuple[str]
+        `.gitignore` style patterns, only the files matching one are kept.
+    du : bool
+        Fill `size` and `usage` of every node. Directories get the totals of
+        their whole subtree, so the walk goes below `max_depth` but only yields
+        the nodes within it. Totals are added to a node when its directory is
+        done, after the node was yielded.
+    collect_stat : bool
+        Fill `stat` of every node, from the same listing when possible.
+    max_entries : int
+        Keep the first entries of each directory only. The others are counted
+        while the directory is read and stand for one placeholder node with
+        `omitted` set. With `du`, omitted directories are still walked for
+        the totals, their nodes are not yielded.
+    time_budget : float
+        Seconds after which no more directory is listed. Directories reached
+        later are yielded with `truncated` set.
+    sort : str
+        Order the entries of each directory by one of `order.KEYS`. Sorting by
+        `size` or `mtime` uses the stat from the listing. `None` keeps the
+        order of `os.scandir`.
+    dirs_first : bool
+        List the directories of each directory before its other entries.
+    reverse : bool
+        Reverse the order of the entries.
+
+    When the entries are sorted, `max_entries` keeps the first ones in that
+    order, so a whole directory is read before it is cut.
+
+    Ignored directories are pruned when their parent is listed, so they are
+    never listed themselves.
+    """
+
+    max_depth: int = 8
+    show_hidden: bool = False
+    follow_links: bool = False
+    jobs: int = 1
+    cache: t.Optional[ListingCache] = field(default=None, repr=False)
+    gitignore: bool = False
+    exclude: t.Tuple[str, ...] = ()
+    include: t.Tuple[str, ...] = ()
+    du: bool = False
+    collect_stat: bool = False
+    max_entries: t.Optional[int] = None
+    time_budget: t.Optional[float] = None
+    sort: t.Optional[str] = None
+    dirs_first: bool = False
+    reverse: bool = False
+
+    def __post_init__(self):
+        self.matcher = None
+        if self.gitignore or self.exclude or self.include:
+            self.matcher = Matcher(self.gitignore, self.exclude, self.include)
+
+    def walk(self, path: str) -> t.Iterator[Node]:
+        """
+        Yield the root node for `path` first, then every visible entry under it.
+        """
+        stack: t.List[_Frame] = []
+        visited: t.Dict[t.Tuple[int, int], str] = {}
+
+        lister = ParallelLister(self, self.jobs, visited=visited) if self.jobs > 1 else Lister(self, visited)
+        complete = False
+        deadline = None if self.time_budget is None else time.monotonic() + self.time_budget
+
+        if self.cache:
+            self.cache.load(self._cache_key(path))
+
+        if self.matcher:
+            self.matcher.reset(path)
+
+        if self.follow_links:
+            visited[_key(os.stat(path))] = path
+
+        try:
+            root = self._root(path)
+            if self.du:
+                _measure(root)
+
+            children, anchor = self.list_dir(path, 1, None, visited)
+            stack.append(_Frame(root, iter(children), anchor, anchor is not None))
+            lister.push(children, anchor)
+            root.has_children = len(children) > 0
+            root.entries = len(children)
+            yield root
+
+            while stack:
+                frame = stack[-1]
+                node = next(frame.entries, None)
+
+                if node is None:
+                    lister.pop()
+                    done = stack.pop()
+                    _close(done)
+                    if self.du and stack:
+                        _add(stack[-1].node, done.node)
+                    continue
+
+                if self.du and not node.omitted:
+                    _measure(node)
+
+                if self._enters(node, visited, deadline):
+                    children, anchor = lister.take(node, frame.anchor)
+                    stack.append(_Frame(
+                        node, iter(children), anchor or frame.anchor, anchor is not None))
+                    lister.push(children, anchor or frame.anchor)
+                    node.has_children = len(children) > 0 and self._shows_children(node)
+                    node.entries = len(children)
+                elif self.du:
+                    _add(frame.node, node)
+
+                if self._shows(node):
+                    yield node
+
+            complete = True
+        finally:
+            lister.close()
+            while stack:
+                _close(stack.pop())
+            if self.cache:
+                self.cache.save(complete)
+
+    def _root(self, path: str) -> Node:
+        root = Node(os.path.basename(path), path, is_dir=True)
+        if self.du or self.collect_stat:
+            root.stat = os.stat(path)
+        return root
+
+    def descends(self, node: Node) -> bool:
+        """
+        Whether the walker lists the children of `node`.
+        """
+        return node.is_dir and (self.du or self._shows_children(node))
+
+    def _shows_children(self, node: Node) -> bool:
+        return self.max_depth <= 0 or node.depth <= self.max_depth
+
+    def _shows(self, node: Node) -> bool:
+        return self.max_depth <= 0 or node.depth <= self.max_depth + 1
+
+    def _enters(self, node: Node, visited: t.Dict[t.Tuple[int, int], str], deadline: t.Optional[float]) -> bool:
+        """
+        Whether the walk lists the children of `node` now.
+        """
+        if not self.descends(node) or self._revisits(node, visited):
+            return False
+
+        if deadline is not None and time.monotonic() > deadline:
+            node.truncated = True
+            return False
+
+        return True
+
+    def _revisits(self, node: Node, visited: t.Dict[t.Tuple[int, int], str]) -> bool:
+        """
+        Whether `node` is a directory already entered while following links.
+        """
+        if not self.follow_links:
+            return False
+
+        first = visited.setdefault(_key(node.stat), node.path)
+        if first == node.path:
+            return False
+
+        node.target = node.target or first
+        return True
+
+    def list_dir(
+            self, path: str, depth: int, anchor: t.Optional[_Anchor],
+            visited: t.Optional[t.Dict[t.Tuple[int, int], str]] = None
+    ) -> t.Tuple[t.List[Node], t.Optional[_Anchor]]:
+        """
+        List the directory at `path` into child nodes.
+
+        `visited` are the directories entered by the walk so far, by device
+        and inode, omitted directories walked for `du` totals are added to it.
+
+        Returns the nodes and a new anchor when the directory had to be kept open.
+        """
+        relpath = path if anchor is None else path[len(anchor.path) + 1:]
+
+        if anchor is None and len(os.fsencode(relpath)) < _ANCHOR_LENGTH:
+            return self._read_dir(path, path, depth, None, visited), None
+
+        fd = os.open(relpath, _DIR_FLAGS, dir_fd=anchor and anchor.fd)
+
+        try:
+            nodes = self._read_dir(fd, path, depth, fd, visited)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        if len(os.fsencode(relpath)) < _ANCHOR_LENGTH:
+            os.close(fd)
+            return nodes, None
+
+        return nodes, _Anchor(fd, path)
+
+    def _read_dir(
+            self, target: t.Union[str, int],
+            path: str, depth: int, dir_fd: t.Optional[int], visited=None
+    ) -> t.List[Node]:
+        """
+        List `target`, a path or an open descriptor of the directory at `path`.
+
+        Entries are filtered while the directory is read. The listing comes
+        from the cache when the directory did not change, and is only stored
+        when it was not cut by `max_entries`. The cache keeps no stat, since
+        a file can change without changing the mtime of its directory.
+        """
+        chain = self.matcher.enter(path, target) if self.matcher else None
+
+        if self.cache is None:
+            with os.scandir(target) as it:
+                return self._select(
+                    self._collect(it, path, depth, dir_fd), chain, path, depth, dir_fd, visited)
+
+        mtime_ns = os.stat(target).st_mtime_ns
+        records = self.cache.get(path, mtime_ns)
+
+        if records is not None:
+            return self._select(
+                self._restore(records, path, depth, dir_fd), chain, path, depth, dir_fd, visited)
+
+        records = []
+        with os.scandir(target) as it:
+            nodes = self._select(
+                self._collect(it, path, depth, dir_fd), chain, path, depth, dir_fd, visited, records)
+
+        if not (nodes and nodes[-1].omitted):
+            self.cache.put(path, mtime_ns, records)
+
+        return nodes
+
+    def _stat(self, entry: os.DirEntry) -> os.stat_result:
+        try:
+            return entry.stat(follow_symlinks=self.follow_links)
+        except OSError:
+            return entry.stat(follow_symlinks=False)
+
+    def _restore(self, records, path: str, depth: int, dir_fd: t.Optional[int]) -> t.Iterator[Node]:
+        """
+        Build the nodes of a cached listing, with a fresh stat when the walk needs one.
+        """
+        for name, is_dir, is_link, target, _ in records:
+            node = Node(name, os.path.join(path, name), depth,
+                        is_dir=is_dir, is_last=False, is_link=is_link, target=target)
+
+            if self._needs_stat(node):
+                node.stat = self._stat_at(name if dir_fd is not None else node.path, dir_fd)
+
+            yield node
+
+    def _stat_at(self, path: str, dir_fd: t.Optional[int]) -> os.stat_result:
+        try:
+            return os.stat(path, dir_fd=dir_fd, follow_symlinks=self.follow_links)
+        except OSError:
+            return os.stat(path, dir_fd=dir_fd, follow_symlinks=False)
+
+    def _select(
+            self, nodes: t.Iterator[Node], chain, path: str, depth: int,
+            dir_fd: t.Optional[int] = None, visited=None, records: t.Optional[list] = None
+    ) -> t.List[Node]:
+        """
+        Drop hidden and ignored entries, sort, stop at `max_entries` and mark the last one kept.
+
+        The entries after `max_entries` are only counted into a placeholder node.
+        `dir_fd` is the open descriptor of the directory, if any, `visited` is
+        passed down from `list_dir`. `records` receives every entry read, for
+        the cache.
+        """
+        kept = self._kept(nodes, chain, records)
+
+        if self.sort or self.dirs_first or self.reverse:
+            kept = iter(arrange(kept, self.sort, self.dirs_first, self.reverse))
+
+        selected = list(itertools.islice(kept, self.max_entries))
+        first = next(kept, None) if self.max_entries else None
+
+        if first is not None:
+            selected.append(self._omitted(first, kept, path, depth, dir_fd, visited))
+
+        if selected:
+            selected[-1].is_last = True
+
+        return selected
+
+    def _kept(self, nodes: t.Iterator[Node], chain, records: t.Optional[list]) -> t.Iterator[Node]:
+        for node in nodes:
+            if records is not None:
+                records.append((node.name, node.is_dir, node.is_link, node.target, None))
+
+            if self._keeps(node, chain):
+                yield node
+
+    def _keeps(self, node: Node, chain) -> bool:
+        if not self.show_hidden and not _is_visible(node.name):
+            return False
+        return not (self.matcher and self.matcher.ignored(node, chain))
+
+    def _omitted(
+            self, first: Node, rest: t.Iterator[Node],
+            path: str, depth: int, dir_fd: t.Optional[int], visited=None
+    ) -> Node:
+        """
+        Count the entries left out into a placeholder, with the totals of their subtrees for `du`.
+        """
+        placeholder = Node('', path, depth, omitted=0)
+        anchor = None if dir_fd is None else _Anchor(dir_fd, path)
+        visited = {} if visited is None else visited
+
+        if self.du:
+            placeholder.size = placeholder.usage = 0
+
+        for node in itertools.chain([first], rest):
+            placeholder.omitted += 1
+            if self.du:
+                _measure(node)
+                if node.is_dir and not self._revisits(node, visited):
+                    self._total(node, anchor, visited)
+                _add(placeholder, node)
+
+        return placeholder
+
+    def _total(self, root: Node, anchor: t.Optional[_Anchor], visited: t.Dict[t.Tuple[int, int], str]):
+        """
+        Add the totals of the subtree of `root` to it, without yielding its nodes.
+
+        Directories already in `visited` while following links are not walked
+        again, the ones walked here are added to it.
+        """
+        children, owned = self.list_dir(root.path, root.depth + 1, anchor, visited)
+        stack = [_Frame(root, iter(children), owned or anchor, owned is not None)]
+
+        try:
+            while stack:
+                frame = stack[-1]
+                node = next(frame.entries, None)
+
+                if node is None:
+                    done = stack.pop()
+                    _close(done)
+                    if stack:
+                        _add(stack[-1].node, done.node)
+                    continue
+
+                if not node.omitted:
+                    _measure(node)
+
+                if node.is_dir and not node.omitted and not self._revisits(node, visited):
+                    children, owned = self.list_dir(node.path, node.depth + 1, frame.anchor, visited)
+                    stack.append(_Frame(node, iter(children), owned or frame.anchor, owned is not None))
+                else:
+                    _add(frame.node, node)
+        finally:
+            while stack:
+                _close(stack.pop())
+
+    def _cache_key(self, path: str) -> str:
+        settings = [
+            (f.name, getattr(self, f.name))
+            for f in fields(self) if f.name not in _UNKEYED
+        ]
+        return repr((path, settings))
+
+    def _collect(
+            self, it: t.Iterable[os.DirEntry],
+            path: str, depth: int, dir_fd: t.Optional[int]
+    ) -> t.Iterator[Node]:
+        """
+        Build the nodes for one listing while its directory is still open.
+        """
+        for entry in it:
+            node = Node(
+                entry.name, os.path.join(path, entry.name), depth,
+                is_dir=entry.is_dir(follow_symlinks=self.follow_links),
+                is_last=False, is_link=entry.is_symlink())
+
+            if node.is_link:
+                node.target = os.readlink(entry.path, dir_fd=dir_fd)
+
+            if self._needs_stat(node):
+                node.stat = self._stat(entry)
+
+            yield node
+
+    def _needs_stat(self, node: Node) -> bool:
+        return (self.du or self.collect_stat or self.sort in STAT_KEYS
+                or (node.is_dir and self.follow_links))
+
+
+def walk(path: str, **options) -> t.Iterator[Node]:
+    """
+    Walk the directory at `path` and yield its nodes in pre-order.
+
+    `options` are the attributes of :class:`Walker`.
+    """
+    return Walker(**options).walk(path)
+
+
+def _measure(node: Node):
+    node.size = node.stat.st_size
+    blocks = getattr(node.stat, 'st_blocks', None)
+    node.usage = node.size if blocks is None else blocks * 512
+
+
+def _add(parent: Node, node: Node):
+    parent.size += node.size
+    parent.usage += node.usage
+
+
+def _key(stat: os.stat_result) -> t.Tuple[int, int]:
+    return stat.st_dev, stat.st_ino
+
+
+def _close(frame: _Frame):
+    if frame.owned:
+        os.close(frame.anchor.fd)
+
+
+def _is_visible(name: str) -> bool:
+    return not name.startswith('.') and not _is_python_cache(name)
+
+
+def _is_python_cache(name: str) -> bool:
+    return name.startswith('__') and name.endswith('__')
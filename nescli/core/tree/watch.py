@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree/watch.py
+# @Time    :   2026-10-19 04:10:36
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Keep the listings of a walk up to date with inotify """
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+import typing as t
+
+from .node import Node
+from .order import STAT_KEYS
+from .walker import Walker
+
+IN_ATTRIB = 0x0004
+IN_CLOSE_WRITE = 0x0008
+IN_MOVED_FROM = 0x0040
+IN_MOVED_TO = 0x0080
+IN_CREATE = 0x0100
+IN_DELETE = 0x0200
+IN_DELETE_SELF = 0x0400
+IN_MOVE_SELF = 0x0800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+# Events which change the listing of a directory.
+LISTING_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT = struct.Struct('iIII')
+
+Event = t.Tuple[int, int, str]
+
+
+def supported() -> bool:
+    """
+    Whether inotify can be used on this platform.
+    """
+    return sys.platform.startswith('linux')
+
+
+class Inotify:
+
+    """
+    A minimal inotify binding on top of the C library, through `ctypes`.
+    """
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._check(self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+
+    def add(self, path: str, mask: int) -> int:
+        """
+        Watch the directory at `path`, returns the watch descriptor.
+        """
+        return self._check(self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask | IN_ONLYDIR))
+
+    def remove(self, wd: int):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: t.Optional[float] = None) -> t.List[Event]:
+        """
+        Wait up to `timeout` seconds for events, `None` waits forever.
+
+        Returns `(wd, mask, name)` for every event read, or an empty list.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+    def _check(self, result: int) -> int:
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+
+class Watcher:
+
+    """
+    Walk a directory once, then follow its changes with inotify.
+
+    Every directory the walker lists is watched. `changes` waits for events
+    and coalesces them, `refresh` lists again the directories which changed
+    only, new subdirectories are walked and deleted ones are forgotten.
+    `nodes` yields the current tree from memory.
+
+    Parameters
+    ----------
+    walker : Walker
+        Gives the listing options. `du`, `cache` and `jobs` are not used.
+    path : str
+        The directory to watch.
+    debounce : float
+        Seconds without events after which a burst of events is over.
+    max_delay : float
+        Seconds after which a burst is reported even if events keep coming,
+        so a steady stream of writes still updates the tree.
+
+    Directories which can not be watched, for example past the
+    `max_user_watches` limit, are still shown but do not update.
+    """
+
+    def __init__(self, walker: Walker, path: str, debounce: float = 0.2, max_delay: float = 1.0):
+        self.walker = walker
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+
+        self._mask = LISTING_EVENTS
+        if walker.sort in STAT_KEYS:
+            self._mask |= IN_CLOSE_WRITE | IN_ATTRIB
+
+        self._inotify = Inotify()
+        self._listings: t.Dict[str, t.List[Node]] = {}
+        self._watches: t.Dict[int, str] = {}
+        self._root = Node(os.path.basename(path), path, is_dir=True)
+
+        if walker.matcher:
+            walker.matcher.reset(path)
+        self._scan(self._root)
+
+    def nodes(self) -> t.Iterator[Node]:
+        """
+        Yield the root then every node under it in pre-order.
+        """
+        self._root.has_children = bool(self._listings.get(self.path))
+        yield self._root
+
+        stack = [iter(self._listings.get(self.path, []))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            children = self._listings.get(node.path)
+            node.has_children = bool(children)
+            yield node
+
+            if children:
+                stack.append(iter(children))
+
+    def changes(self, timeout: t.Optional[float] = None) -> t.Set[str]:
+        """
+        Wait for a burst of events and return the directories it changed.
+
+        Returns an empty set when nothing happened within `timeout`.
+        """
+        changed: t.Set[str] = set()
+        events = self._inotify.read(timeout)
+        deadline = time.monotonic() + self.max_delay
+
+        while events:
+            for wd, mask, _ in events:
+                self._record(changed, wd, mask)
+
+            wait = min(self.debounce, deadline - time.monotonic())
+            events = self._inotify.read(wait) if wait > 0 else []
+
+        return changed
+
+    def refresh(self, dirs: t.Iterable[str]):
+        """
+        List `dirs` again, parents first.
+        """
+        for path in sorted(dirs, key=len):
+            node = self._find(path)
+            if node is not None:
+                self._relist(node)
+
+    def close(self):
+        self._inotify.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _record(self, changed: t.Set[str], wd: int, mask: int):
+        if mask & IN_Q_OVERFLOW:
+            changed.update(self._listings)
+            return
+
+        path = self._watches.get(wd)
+        if path is None:
+            return
+
+        if mask & IN_IGNORED:
+            del self._watches[wd]
+            return
+
+        changed.add(os.path.dirname(path) if mask & (IN_DELETE_SELF | IN_MOVE_SELF) else path)
+
+    def _find(self, path: str) -> t.Optional[Node]:
+        if path == self.path:
+            return self._root
+
+        for node in self._listings.get(os.path.dirname(path), []):
+            if node.path == path:
+                return node
+
+        return None
+
+    def _relist(self, node: Node):
+        """
+        List `node` again, walk its new directories and forget the ones gone.
+
+        Only the children which had a listing are forgotten, so files
+        cost nothing.
+        """
+        old = {child.path for child in self._listings.get(node.path, [])} & self._listings.keys()
+
+        try:
+            children, _ = self.walker.list_dir(node.path, node.depth + 1, None)
+        except FileNotFoundError:
+            children = []
+
+        self._listings[node.path] = children
+
+        for child in children:
+            if child.path not in self._listings and self._descends(child):
+                self._scan(child)
+
+        kept = {child.path for child in children if self._descends(child)}
+        for path in old - kept:
+            self._forget(path)
+
+    def _scan(self, top: Node):
+        """
+        Watch and list `top` and the directories under it.
+        """
+        stack = [top]
+
+        while stack:
+            node = stack.pop()
+            self._watch(node.path)
+
+            try:
+                children, _ = self.walker.list_dir(node.path, node.depth + 1, None)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            self._listings[node.path] = children
+            stack.extend(child for child in children if self._descends(child))
+
+    def _descends(self, node: Node) -> bool:
+        return self.walker.descends(node) and not node.is_link
+
+    def _watch(self, path: str):
+        try:
+            self._watches[self._inotify.add(path, self._mask)] = path
+        except OSError:
+            pass
+
+    def _forget(self, path: str):
+        prefix = path + os.sep
+        for listed in [p for p in self._listings if p == path or p.startswith(prefix)]:
+            del self._listings[listed]
+
+        for wd, watched in list(self._watches.items()):
+            if watched == path or watched.startswith(prefix):
+                self._inotify.remove(wd)
+                del self._watches[wd]
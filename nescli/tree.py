@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# @File    :   tree.py
+# @Time    :   2026-10-19 09:05:43
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+"""
+    Python API of the `tree` command.
+
+    .. code-block:: python
+
+        from nescli import tree
+
+        for node in tree.walk('.', depth=2):
+            print(node.path, node.is_dir)
+
+        print('\\n'.join(tree.render(tree.walk('.', depth=2))))
+
+    Nothing here reads or writes the nescli configuration.
+"""
+
+import os
+import typing as t
+
+from nescli.core.tree import Node, is_archive, walk_archive
+from nescli.core.tree import render as render_lines
+from nescli.core.tree import walk as walk_directory
+
+__all__ = ['Node', 'walk', 'render']
+
+
+def walk(path: str = '.', depth: int = 8, show_hidden: bool = False, **options) -> t.Iterator[Node]:
+    """
+    Walk `path` and yield its nodes in pre-order, the root first.
+
+    Parameters
+    ----------
+    path : str
+        A directory, or a zip or tar archive whose members are walked.
+    depth : int
+        Recursion depth to walk, `0` means no limit.
+    show_hidden : bool
+        Keep hidden files and python dunder folders.
+    options :
+        The other attributes of :class:`nescli.core.tree.Walker`, such as
+        `sort`, `gitignore`, `exclude`, `du` or `max_entries`.
+    """
+    path = os.path.abspath(path)
+    walker = walk_archive if is_archive(path) else walk_directory
+    return walker(path, max_depth=depth, show_hidden=show_hidden, **options)
+
+
+def render(nodes: t.Iterable[Node]) -> t.Iterator[str]:
+    """
+    Yield the box-drawing line of every node, without colors.
+    """
+    for line in render_lines(nodes):
+        yield line.content
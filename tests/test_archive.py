@@ -0,0 +1,84 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from nescli.core.tree import is_archive, walk_archive, render
+
+MEMBERS = {
+    'pkg/__init__.py': b'',
+    'pkg/sub/mod.py': b'x' * 10,
+    'pkg/.hidden': b'',
+    'README.md': b'readme',
+}
+
+
+@pytest.fixture
+def wheel(tmp_path):
+    path = str(tmp_path / 'pkg-1.0-py3-none-any.whl')
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in MEMBERS.items():
+            archive.writestr(name, data)
+    return path
+
+
+@pytest.fixture
+def tarball(tmp_path):
+    path = str(tmp_path / 'pkg-1.0.tar.gz')
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo('pkg-1.0/' + name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo('pkg-1.0/latest')
+        link.type = tarfile.SYMTYPE
+        link.linkname = 'pkg'
+        archive.addfile(link)
+    return path
+
+
+def _members(nodes, root):
+    return {node.path[len(root) + 1:]: node for node in nodes if node.depth}
+
+
+def test_zip_should_be_walked_from_its_members(wheel):
+    nodes = _members(walk_archive(wheel, max_depth=0, sort='name'), wheel)
+
+    assert sorted(nodes) == ['README.md', 'pkg', 'pkg/__init__.py', 'pkg/sub', 'pkg/sub/mod.py']
+    assert nodes['pkg/sub'].is_dir
+    assert nodes['pkg/sub/mod.py'].stat.st_size == 10
+
+
+def test_tar_should_be_walked_in_one_stream(tarball):
+    nodes = _members(walk_archive(tarball, max_depth=0, show_hidden=True), tarball)
+
+    assert 'pkg-1.0/pkg/.hidden' in nodes
+    assert nodes['pkg-1.0/latest'].is_link
+    assert nodes['pkg-1.0/latest'].target == 'pkg'
+    assert nodes['pkg-1.0/pkg/sub/mod.py'].depth == 4
+
+
+def test_archive_should_render_like_a_directory(wheel):
+    lines = [line.content for line in render(walk_archive(wheel, sort='name', dirs_first=True))]
+
+    assert lines == [
+        '┌pkg-1.0-py3-none-any.whl',
+        '├─┬pkg',
+        '│ ├─┬sub',
+        '│ │ └──mod.py',
+        '│ └──__init__.py',
+        '└──README.md',
+    ]
+
+
+def test_archive_du_should_total_member_sizes(wheel):
+    root, *_ = list(walk_archive(wheel, du=True))
+
+    assert root.size == sum(len(data) for data in MEMBERS.values())
+
+
+def test_is_archive(wheel, tarball, tmp_path):
+    assert is_archive(wheel)
+    assert is_archive(tarball)
+    assert not is_archive(str(tmp_path))
@@ -5,15 +5,18 @@ except ImportError:
 
 from pathlib import Path
 import os
+import sys
 import json
 
 from nescli.commands.conf_manage import (
     _check_conf_template_folder,
     _set_template,
+    _save_template,
     _remove_template,
     _get_template
 )
 from nescli import config
+from utils import echo
 
 
 @pytest.fixture
@@ -45,3 +48,79 @@ def test_get_template(tmp_path):
     result = _get_template(tmp)
     assert [tmp, 'desc'] == [result.name, result.desc]
     _remove_template(tmp)
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntl is not available')
+def test_replace_prompt_should_not_hold_the_config_lock(monkeypatch):
+    import fcntl
+
+    asked = []
+
+    def confirm_replace(key, old):
+        fd = os.open(config._path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Raises BlockingIOError while the config is locked.
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(fd)
+        asked.append(key)
+        return False
+
+    _save_template('lock-test', 'a.cfg', None)
+    monkeypatch.setattr(echo, 'confirm_replace', confirm_replace)
+
+    try:
+        _set_template('lock-test', 'b.cfg', None)
+    finally:
+        _remove_template('lock-test')
+
+    assert asked == ['lock-test']
+
+
+def test_commands_should_write_the_config_at_most_once(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from nescli.commands.conf_manage import confcli
+
+    writes = []
+    write = config._write_config
+    monkeypatch.setattr(config, '_write_config', lambda: writes.append(1) or write())
+
+    source = tmp_path / 'write-test.cfg'
+    source.write_text('x')
+    (tmp_path / 'out').mkdir()
+    runner = CliRunner()
+
+    try:
+        assert runner.invoke(confcli, ['save', 'write-test', str(source)]).exit_code == 0
+        assert len(writes) == 1
+
+        assert runner.invoke(confcli, ['use', 'write-test', str(tmp_path / 'out')]).exit_code == 0
+        assert runner.invoke(confcli, ['use', 'missing-key']).exit_code == 0
+        assert runner.invoke(confcli, ['list']).exit_code == 0
+        assert len(writes) == 1
+    finally:
+        _remove_template('write-test')
+
+
+def test_templates_should_move_to_their_own_keys(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from nescli.commands import conf_manage
+    from nescli.core.config import CLIConfig
+
+    conf = CLIConfig(str(tmp_path / 'db'), backend='sqlite')
+    conf.set('config_templates', {'a': ['a.cfg', None]})
+    monkeypatch.setattr(conf_manage, 'config', conf)
+
+    assert _get_template('a') == ('a.cfg', None)
+
+    _save_template('b', 'b.cfg', 'desc')
+    assert conf.get('config_templates') is None
+    assert conf.items('config_templates.') == {
+        'config_templates.a': ['a.cfg', None],
+        'config_templates.b': ['b.cfg', 'desc'],
+    }
+
+    monkeypatch.setattr(conf.store, 'load', lambda: pytest.fail('Every value was read.'))
+    result = CliRunner().invoke(conf_manage.confcli, ['list'])
+    assert result.exit_code == 0
+    assert 'a.cfg' in result.output and 'b.cfg' in result.output
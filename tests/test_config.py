@@ -1,5 +1,7 @@
 import pytest
 import os
+import subprocess
+import sys
 
 from nescli.core.config import CLIConfig
 
@@ -14,6 +16,7 @@ def preset_config(config):
     config.set('preset', True)
     yield
     os.remove('./.test_config')
+    os.remove('./.test_config.lock')
 
 
 def test_config_file_should_be_saved_after_set_new_value(config):
@@ -28,3 +31,173 @@ def test_load_preset_will_be_True(config):
 def test_remove_config(config):
     config.remove('preset')
     assert config.get('preset') == None
+
+
+def _counting(conf, monkeypatch):
+    writes = []
+    write = conf._write_config
+    monkeypatch.setattr(conf, '_write_config', lambda: writes.append(1) or write())
+    return writes
+
+
+def test_transaction_should_write_once(tmp_path, monkeypatch):
+    conf = CLIConfig(str(tmp_path / 'conf'))
+    writes = _counting(conf, monkeypatch)
+
+    with conf.transaction():
+        conf.set('a', 1)
+        with conf.transaction():
+            conf.set('b', 2)
+        conf.remove('a')
+        assert writes == []
+
+    assert writes == [1]
+    assert CLIConfig(conf._path).get('b') == 2
+    assert CLIConfig(conf._path).get('a') is None
+
+
+def test_transaction_without_changes_should_not_write(tmp_path, monkeypatch):
+    conf = CLIConfig(str(tmp_path / 'conf'))
+    writes = _counting(conf, monkeypatch)
+
+    with conf.transaction():
+        conf.get('user')
+
+    assert writes == []
+    assert not os.path.exists(conf._path)
+
+
+def test_failed_transaction_should_be_dropped(tmp_path):
+    conf = CLIConfig(str(tmp_path / 'conf'))
+    conf.set('kept', True)
+
+    with pytest.raises(RuntimeError):
+        with conf.transaction():
+            conf.set('dropped', True)
+            raise RuntimeError()
+
+    assert conf.get('dropped') is None
+    assert CLIConfig(conf._path).get('dropped') is None
+    assert conf.get('kept')
+
+
+def test_write_should_leave_no_temporary_file(tmp_path):
+    conf = CLIConfig(str(tmp_path / 'conf'))
+    conf.set('a', 1)
+
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.conf.')]
+
+
+IMPORT_SCRIPT = '''
+import os
+import sys
+
+home = os.environ['HOME']
+touched = []
+
+
+def audit(event, args):
+    if event in ('open', 'os.listdir', 'os.scandir') and args and str(args[0]).startswith(home):
+        touched.append((event, args[0]))
+
+
+sys.addaudithook(audit)
+stat = os.stat
+os.stat = lambda path, *args, **kwargs: touched.append(('stat', path)) or stat(path, *args, **kwargs)
+
+import nescli
+from nescli import config
+
+assert touched == [], touched
+assert config.get('user') == 'lazy'
+assert touched, 'The config was not read on first access.'
+'''
+
+
+def test_import_should_not_touch_the_file_system(tmp_path):
+    (tmp_path / '.nescli.conf').write_text('{"user": "lazy"}')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT], cwd=root,
+        env=dict(os.environ, HOME=str(tmp_path)),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    assert result.returncode == 0, result.stdout
+
+
+COMMAND_IMPORT_SCRIPT = '''
+import os
+import sys
+
+home = os.environ['HOME']
+opened = []
+
+
+def audit(event, args):
+    if event == 'open' and args and str(args[0]).startswith(os.path.join(home, '.nescli.conf')):
+        opened.append(args[0])
+
+
+sys.addaudithook(audit)
+
+try:
+    __import__(sys.argv[1])
+except ImportError as e:
+    print(e)
+    sys.exit(3)
+
+from nescli import config
+
+assert opened == [], opened
+assert config._data is None
+'''
+
+
+@pytest.mark.parametrize('module', [
+    'nescli.commands.tree', 'nescli.commands.pypkg', 'nescli.commands.file',
+    'nescli.commands.qrconsole', 'nescli.commands.conf_manage',
+])
+def test_importing_a_command_should_not_read_the_config(tmp_path, module):
+    (tmp_path / '.nescli.conf').write_text('{"user": "lazy"}')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    result = subprocess.run(
+        [sys.executable, '-c', COMMAND_IMPORT_SCRIPT, module], cwd=root,
+        env=dict(os.environ, HOME=str(tmp_path), TMPDIR=str(tmp_path)),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    if result.returncode == 3:
+        pytest.skip(f'{module} can not be imported here: {result.stdout.strip()}')
+    assert result.returncode == 0, result.stdout
+
+
+WRITER_SCRIPT = """
+import sys
+
+from nescli.core.config import CLIConfig
+
+path, name = sys.argv[1:]
+conf = CLIConfig(path)
+
+for i in range(10):
+    with conf.transaction():
+        conf.set('counter', conf.get('counter', 0) + 1)
+    conf.set(name, i)
+"""
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='fcntl is not available')
+def test_concurrent_writers_should_not_lose_updates(tmp_path):
+    path = str(tmp_path / 'conf')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    writers = [
+        subprocess.Popen([sys.executable, '-c', WRITER_SCRIPT, path, f'writer{i}'], cwd=root)
+        for i in range(32)
+    ]
+    assert [writer.wait() for writer in writers] == [0] * 32
+
+    conf = CLIConfig(path)
+    assert conf.get('counter') == 320
+    assert all(conf.get(f'writer{i}') == 9 for i in range(32))
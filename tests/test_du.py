@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from nescli.core.tree import walk, totals
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'small' / 'deep' / 'deeper')
+    os.makedirs(tmp_path / 'large')
+    (tmp_path / 'small' / 'deep' / 'deeper' / 'f').write_bytes(b'x' * 10)
+    (tmp_path / 'large' / 'f').write_bytes(b'x' * 100000)
+    (tmp_path / 'top').write_bytes(b'x' * 5)
+    return str(tmp_path)
+
+
+def _apparent(path):
+    total = os.lstat(path).st_size
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in dirnames + filenames:
+            total += os.lstat(os.path.join(dirpath, name)).st_size
+    return total
+
+
+def test_du_should_total_whole_subtree_below_max_depth(sample):
+    nodes = walk(sample, max_depth=1, du=True)
+    root = next(nodes)
+    shown = {node.name: node for node in totals(nodes)}
+
+    assert 'deeper' not in shown
+    assert not shown['deep'].has_children
+    assert shown['small'].size == _apparent(os.path.join(sample, 'small'))
+    assert root.size == _apparent(sample)
+    assert root.usage >= shown['large'].usage >= 100000
+
+
+def test_by_size_should_list_largest_first(sample):
+    nodes = walk(sample, max_depth=0, du=True)
+    next(nodes)
+    top = [node for node in totals(nodes, by_size=True) if node.depth == 1]
+
+    assert top[0].name == 'large'
+    assert [node.usage for node in top] == sorted((node.usage for node in top), reverse=True)
+    assert [node.is_last for node in top] == [False] * (len(top) - 1) + [True]
+
+
+@pytest.mark.parametrize('loop', [False, True])
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_omitted_directories_should_count_their_whole_subtree(sample, jobs, loop):
+    extra = 0
+    if loop:
+        link = os.path.join(sample, 'small', 'deep', 'loop')
+        os.symlink(sample, link)
+        # The link counts as the directory it points to, which is not walked again.
+        extra = os.stat(link).st_size - os.lstat(link).st_size
+
+    nodes = walk(sample, max_depth=0, du=True, max_entries=1, sort='name', jobs=jobs, follow_links=loop)
+    root = next(nodes)
+    shown = list(totals(nodes))
+
+    placeholder = next(node for node in shown if node.omitted and node.depth == 1)
+    assert placeholder.omitted == 2
+    assert placeholder.size == _apparent(os.path.join(sample, 'small')) + 5 + extra
+    assert root.size == _apparent(sample) + extra
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from nescli.core.tree import walk
+from nescli.core.tree import dupes
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'a')
+    big = os.urandom(3 * dupes.BLOCK_SIZE)
+    (tmp_path / 'big1').write_bytes(big)
+    (tmp_path / 'a' / 'big2').write_bytes(big)
+    # Same size, same first and last blocks, different middle.
+    (tmp_path / 'a' / 'big3').write_bytes(big[:dupes.BLOCK_SIZE] + b'x' * dupes.BLOCK_SIZE + big[-dupes.BLOCK_SIZE:])
+    (tmp_path / 'small1').write_text('same')
+    (tmp_path / 'a' / 'small2').write_text('same')
+    (tmp_path / 'unique').write_text('unique size')
+    (tmp_path / 'empty1').write_text('')
+    (tmp_path / 'empty2').write_text('')
+    os.link(tmp_path / 'small1', tmp_path / 'hardlink')
+    return str(tmp_path)
+
+
+def _find(path, **options):
+    groups = dupes.duplicates(walk(path, max_depth=0, collect_stat=True), **options)
+    return [(group.size, sorted(os.path.relpath(p, path) for p in group.paths)) for group in groups]
+
+
+def test_duplicates_should_be_grouped_by_content(sample):
+    groups = _find(sample, workers=2)
+
+    assert groups[0] == (3 * dupes.BLOCK_SIZE, ['a/big2', 'big1'])
+    assert len(groups) == 2
+
+
+def test_hard_links_should_count_once(sample):
+    size, paths = _find(sample)[1]
+
+    assert size == 4
+    assert len(paths) == 2
+    assert 'a/small2' in paths
+
+
+def test_files_with_unique_size_should_never_be_read(sample, monkeypatch):
+    read = []
+    partial = dupes.partial_hash
+    monkeypatch.setattr(dupes, 'partial_hash', lambda path: read.append(path) or partial(path))
+
+    _find(sample)
+
+    assert os.path.join(sample, 'unique') not in read
+    assert not any(os.path.basename(path).startswith('empty') for path in read)
+
+
+def test_reclaimable_should_keep_one_copy():
+    assert dupes.reclaimable(dupes.Group(10, ['a', 'b', 'c'])) == 20
+
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_dupes_command_should_hash_on_jobs_threads(sample, monkeypatch, jobs):
+    from click.testing import CliRunner
+    from nescli.commands import tree
+
+    calls = []
+
+    def duplicates(nodes, workers=None):
+        calls.append(workers)
+        return dupes.duplicates(nodes, workers)
+
+    monkeypatch.setattr(tree, 'duplicates', duplicates)
+
+    assert CliRunner().invoke(tree.tree, [sample, '--dupes', '--jobs', str(jobs)]).exit_code == 0
+    assert calls == [jobs]
@@ -0,0 +1,101 @@
+import itertools
+import json
+import os
+from html.parser import HTMLParser
+
+import pytest
+
+from nescli.core.tree import Node, walk, ndjson, json_array, html, totals
+from nescli.core.tree.render import label
+from utils.strutil import human_size
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'a')
+    (tmp_path / 'a' / 'x.txt').write_text('hello')
+    return str(tmp_path)
+
+
+def test_ndjson_should_write_one_record_per_node(sample):
+    lines = list(ndjson(walk(sample, collect_stat=True)))
+    records = [json.loads(line) for line in lines]
+
+    assert [record['depth'] for record in records] == [0, 1, 2]
+    assert records[2]['path'] == os.path.join(sample, 'a', 'x.txt')
+    assert records[2]['type'] == 'file'
+    assert records[2]['size'] == 5
+    assert records[1]['type'] == 'directory'
+    assert isinstance(records[2]['mtime'], float)
+
+
+def test_json_array_should_be_valid_json(sample):
+    records = json.loads(''.join(json_array(walk(sample, collect_stat=True))))
+
+    assert len(records) == 3
+    assert json.loads(''.join(json_array([]))) == []
+
+
+def test_ndjson_should_be_lazy():
+    def nodes():
+        yield Node('root', '/root', 0, is_dir=True, has_children=True)
+        raise AssertionError('ndjson consumed more nodes than needed.')
+
+    assert json.loads(next(ndjson(nodes())))['path'] == '/root'
+
+
+class _Tags(HTMLParser):
+
+    def __init__(self):
+        super().__init__()
+        self.open = []
+
+    def handle_starttag(self, tag, attrs):
+        self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        assert self.open.pop() == tag
+
+
+def _page(nodes, **options):
+    parser = _Tags()
+    page = ''.join(html(nodes, title='<t>', **options))
+    parser.feed(page.replace('<meta charset="utf-8">', '').replace('<!DOCTYPE html>', ''))
+    return page, parser
+
+
+def test_html_should_nest_directories(sample):
+    page, parser = _page(walk(sample))
+
+    assert parser.open == []
+    assert '<title>&lt;t&gt;</title>' in page
+    assert '<details open><summary>' in page
+    assert '<summary>a</summary><ul>' in page
+    assert '<li class="file">x.txt</li>' in page
+
+
+def test_html_should_defer_large_directories(sample):
+    page, parser = _page(walk(sample), lazy_threshold=0)
+
+    assert parser.open == []
+    assert '<summary>a</summary><template><ul>' in page
+
+
+def test_html_should_be_lazy():
+    def nodes():
+        yield Node('root', '/root', 0, is_dir=True, has_children=True)
+        raise AssertionError('html consumed more nodes than needed.')
+
+    chunks = html(nodes())
+    next(chunks)
+    assert '<summary>root</summary>' in next(chunks)
+
+
+def test_html_should_update_the_root_total(sample):
+    nodes = walk(sample, du=True)
+    root = next(nodes)
+    page, parser = _page(itertools.chain([root], totals(nodes)))
+
+    assert parser.open == []
+    assert f'textContent = {json.dumps(label(root))};' in page
+    assert human_size(root.usage) in label(root)
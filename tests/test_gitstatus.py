@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from nescli.core.tree import Node, walk
+from nescli.core.tree.gitstatus import GitStatus, find_top
+
+OUTPUT = b'\0'.join([
+    b'1 .M N... 100644 100644 100644 6178 6178 src/pkg/mod.py',
+    b'1 A. N... 000000 100644 100644 0000 b478 src/new.py',
+    b'2 R. N... 100644 100644 100644 6178 6178 R100 src/moved.py', b'src/old.py',
+    b'? notes/',
+    b'! build/',
+    b'',
+])
+
+
+@pytest.fixture
+def status():
+    status = GitStatus('/repo', '/repo')
+    status.parse(OUTPUT)
+    return status
+
+
+def test_files_should_get_their_status(status):
+    assert status.get('/repo/src/pkg/mod.py') == 'M'
+    assert status.get('/repo/src/new.py') == 'S'
+    assert status.get('/repo/src/moved.py') == 'S'
+    assert status.get('/repo/src/old.py') is None
+    assert status.get('/repo/README') is None
+
+
+def test_directories_should_roll_up_the_most_important_status(status):
+    assert status.get('/repo/src/pkg') == 'M'
+    assert status.get('/repo/src') == 'M'
+    assert status.get('/repo') == 'M'
+
+
+def test_ignored_entries_should_not_roll_up(status):
+    status = GitStatus('/repo', '/repo')
+    status.parse(b'! build/\0')
+
+    assert status.get('/repo/build') == '!'
+    assert status.get('/repo') is None
+
+
+def test_whole_directories_should_pass_their_status_down(status):
+    nodes = [
+        Node('notes', '/repo/notes', 1, is_dir=True),
+        Node('todo', '/repo/notes/todo', 2),
+        Node('build', '/repo/build', 1, is_dir=True),
+        Node('out.o', '/repo/build/out.o', 2),
+        Node('README', '/repo/README', 1),
+    ]
+
+    assert [node.git for node in status.annotate(nodes)] == ['?', '?', '!', '!', None]
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+def test_status_should_come_from_one_git_call(tmp_path):
+    def git(*args):
+        subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args],
+                       cwd=tmp_path, check=True, stdout=subprocess.DEVNULL)
+
+    os.makedirs(tmp_path / 'sub')
+    (tmp_path / 'sub' / 'kept').write_text('a')
+    git('init', '-q')
+    git('add', '.')
+    git('commit', '-q', '-m', 'init')
+    (tmp_path / 'sub' / 'kept').write_text('b')
+    (tmp_path / 'loose').write_text('c')
+
+    status = GitStatus.read(str(tmp_path / 'sub'))
+    assert find_top(str(tmp_path / 'sub')) == str(tmp_path)
+
+    nodes = {node.name: node.git for node in status.annotate(walk(str(tmp_path / 'sub')))}
+    assert nodes == {'sub': 'M', 'kept': 'M'}
@@ -16,10 +16,11 @@ def setup_config(config):
     config.set('user', 'root')
     config.set('email', 'test@example.com')
     yield
-    try:
-        os.remove('./.test_config')
-    except FileNotFoundError:
-        pass
+    for path in ('./.test_config', './.test_config.lock'):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
 @pytest.fixture
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from nescli.core.tree import walk
+from nescli.core.tree.ignore import Rules, compile_pattern
+
+
+@pytest.mark.parametrize('pattern, path, is_dir, expected', [
+    ('*.pyc', 'a.pyc', False, True),
+    ('*.pyc', 'pkg/sub/a.pyc', False, True),
+    ('build/', 'build', True, True),
+    ('build/', 'build', False, None),
+    ('/dist', 'dist', True, True),
+    ('/dist', 'pkg/dist', True, None),
+    ('doc/*.txt', 'doc/a.txt', False, True),
+    ('doc/*.txt', 'doc/sub/a.txt', False, None),
+    ('**/logs', 'a/b/logs', True, True),
+    ('a/**/b', 'a/b', True, True),
+    ('a/**/b', 'a/x/y/b', True, True),
+    ('cache/**', 'cache/x/y', False, True),
+    ('file[0-9].txt', 'file3.txt', False, True),
+    ('file[!0-9].txt', 'file3.txt', False, None),
+    ('\\#hash', '#hash', False, True),
+])
+def test_rules_should_match_like_git(pattern, path, is_dir, expected):
+    assert Rules([pattern]).match(path, is_dir) is expected
+
+
+def test_comments_and_blank_lines_should_be_skipped():
+    assert compile_pattern('# comment') is None
+    assert compile_pattern('\n') is None
+    assert not Rules(['# comment', ''])
+
+
+def test_last_matching_pattern_should_win():
+    rules = Rules(['*.log', '!keep.log'])
+
+    assert rules.match('debug.log', False) is True
+    assert rules.match('keep.log', False) is False
+
+
+@pytest.fixture
+def project(tmp_path):
+    os.makedirs(tmp_path / 'src' / 'build')
+    os.makedirs(tmp_path / 'node_modules' / 'pkg')
+    (tmp_path / '.gitignore').write_text('node_modules/\n*.log\n')
+    (tmp_path / 'src' / '.gitignore').write_text('build/\n!keep.log\n')
+    (tmp_path / 'src' / 'main.py').write_text('')
+    (tmp_path / 'src' / 'debug.log').write_text('')
+    (tmp_path / 'src' / 'keep.log').write_text('')
+    (tmp_path / 'README.md').write_text('')
+    return str(tmp_path)
+
+
+def _relpaths(path, **options):
+    return sorted(
+        os.path.relpath(node.path, path)
+        for node in walk(path, max_depth=0, **options) if node.depth > 0)
+
+
+def test_walk_should_prune_gitignored_entries(project):
+    assert _relpaths(project, gitignore=True) == [
+        'README.md', 'src', 'src/keep.log', 'src/main.py']
+
+
+def test_walk_should_exclude_and_include_patterns(project):
+    assert 'src/main.py' not in _relpaths(project, exclude=('*.py',))
+    assert _relpaths(project, include=('*.md',)) == [
+        'README.md', 'node_modules', 'node_modules/pkg', 'src', 'src/build']
@@ -0,0 +1,41 @@
+try:
+    import pytest
+except ImportError:
+    import unittest
+
+import io
+
+from utils import BufferedSink
+
+
+def test_sink_should_not_style_when_not_a_tty():
+    buf = io.StringIO()
+    with BufferedSink(buf) as out:
+        out.write('line', fg='blue')
+
+    assert buf.getvalue() == 'line\n'
+
+
+def test_sink_should_style_when_color_is_forced():
+    buf = io.StringIO()
+    with BufferedSink(buf, color=True) as out:
+        out.write('line', fg='blue')
+
+    assert buf.getvalue() == '\033[34mline\033[0m\n'
+
+
+def test_sink_should_batch_writes():
+    writes = []
+
+    class Stream(io.StringIO):
+        def write(self, s):
+            writes.append(s)
+            return super().write(s)
+
+    stream = Stream()
+    with BufferedSink(stream, buffer_size=1024, interval=60) as out:
+        for i in range(100):
+            out.write(f'line {i}')
+
+    assert stream.getvalue().count('\n') == 100
+    assert len(writes) < 10
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from nescli.core.tree import render, snapshot, walk
+
+
+@pytest.fixture
+def sample(tmp_path):
+    root = tmp_path / 'root'
+    os.makedirs(root / 'a' / 'b')
+    os.makedirs(root / 'c')
+    (root / 'a' / 'b' / 'f').write_text('f')
+    (root / 'c' / 'g').write_text('g')
+    (root / 'top').write_text('top')
+    return str(root)
+
+
+def _entries(path):
+    return snapshot.entries(walk(path, max_depth=0, sort='name', collect_stat=True))
+
+
+def _changes(old, path):
+    return [(status, entry.path) for status, entry in snapshot.diff(old, _entries(path))]
+
+
+def test_snapshot_should_round_trip(sample, tmp_path):
+    file = str(tmp_path / 'snap.bin')
+
+    assert snapshot.save(file, _entries(sample)) == 6
+    assert list(snapshot.load(file)) == list(_entries(sample))
+
+
+def test_unchanged_tree_should_have_no_changes(sample):
+    assert _changes(list(_entries(sample)), sample) == []
+
+
+def test_diff_should_find_added_removed_and_modified(sample):
+    old = list(_entries(sample))
+
+    os.remove(os.path.join(sample, 'top'))
+    os.makedirs(os.path.join(sample, 'B', 'new'))
+    with open(os.path.join(sample, 'c', 'g'), 'a') as f:
+        f.write('more')
+
+    assert _changes(old, sample) == [
+        ('+', 'B'), ('+', 'B/new'), ('~', 'c/g'), ('-', 'top'),
+    ]
+
+
+def test_diff_should_render_with_parents(sample):
+    old = list(_entries(sample))
+    open(os.path.join(sample, 'a', 'b', 'new'), 'w').close()
+    os.remove(os.path.join(sample, 'c', 'g'))
+
+    nodes = snapshot.nodes(snapshot.diff(old, _entries(sample)), sample)
+
+    assert [line.content for line in render(nodes)] == [
+        '┌root',
+        '├─┬a',
+        '│ └─┬b',
+        '│   └──+ new',
+        '└─┬c',
+        '  └──- g',
+    ]
+
+
+def test_load_should_reject_other_files(sample, tmp_path):
+    file = tmp_path / 'other.bin'
+    file.write_text('not a snapshot')
+
+    with pytest.raises(OSError):
+        list(snapshot.load(str(file)))
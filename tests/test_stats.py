@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from nescli.core.tree import Stats, walk
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'src' / 'empty')
+    os.makedirs(tmp_path / 'deep' / 'deeper')
+    (tmp_path / 'src' / 'a.py').write_bytes(b'x' * 10)
+    (tmp_path / 'src' / 'B.PY').write_bytes(b'x' * 5)
+    (tmp_path / 'README').write_bytes(b'x' * 3)
+    return str(tmp_path)
+
+
+def _count(path, max_depth=0, **options):
+    stats = Stats(max_depth, sized=True)
+    nodes = list(stats.count(walk(path, max_depth=max_depth, collect_stat=True, **options)))
+    return stats, nodes
+
+
+def test_stats_should_pass_nodes_through(sample):
+    _, nodes = _count(sample)
+
+    assert [node.path for node in nodes] == [node.path for node in walk(sample, max_depth=0)]
+
+
+def test_stats_should_count_files_per_extension(sample):
+    stats, _ = _count(sample)
+
+    assert stats.extensions == {'.py': 2, '(none)': 1}
+    assert stats.extension_bytes == {'.py': 15, '(none)': 3}
+    assert stats.types['file'] == 3
+    assert stats.type_bytes['file'] == 18
+
+
+def test_stats_should_count_empty_directories(sample):
+    stats, _ = _count(sample)
+
+    assert stats.types['empty directory'] == 2
+    assert stats.types['directory'] == 2
+
+
+def test_directories_below_max_depth_should_not_be_empty(sample):
+    stats, _ = _count(sample, max_depth=1)
+
+    assert stats.types['empty directory'] == 0
+    assert stats.types['directory'] == 4
+
+
+def test_stats_should_count_omitted_entries(sample):
+    stats, _ = _count(sample, max_entries=1, sort='name')
+
+    assert stats.omitted == 2
+
+
+def test_stats_without_stat_should_only_count(sample):
+    stats = Stats()
+    list(stats.count(walk(sample, max_depth=0)))
+
+    assert not stats.sized
+    assert stats.types['file'] == 3
+    assert stats.type_bytes['file'] == 0
+
+
+def test_stats_of_a_walk_following_links_should_not_be_sized(sample):
+    from click.testing import CliRunner
+    from nescli.commands.tree import tree
+
+    result = CliRunner().invoke(tree, [sample, '--stats', '--follow-links'])
+
+    assert result.exit_code == 0
+    assert 'SIZE' not in result.output
+    assert 'SIZE' in CliRunner().invoke(tree, [sample, '--stats', '--du']).output
@@ -0,0 +1,256 @@
+import json
+import os
+
+import pytest
+
+from nescli.core.config import CLIConfig
+from nescli.core.storage import JournalStore, migrate
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    return CLIConfig(str(tmp_path / 'journal'), backend='journal')
+
+
+def _lines(conf):
+    with open(conf._path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_journal_should_replay_changes(journal):
+    journal.set('a', 1)
+    journal.set('b', [1, 2])
+    journal.remove('a')
+
+    conf = CLIConfig(journal._path, backend='journal')
+    assert conf.get('a') is None
+    assert conf.get('b') == [1, 2]
+    assert conf.get('user') == 'undefined'
+
+
+def test_journal_set_should_only_append(journal, monkeypatch):
+    journal.set('a', 1)
+    size = os.path.getsize(journal._path)
+
+    monkeypatch.setattr(journal.store, 'load', lambda: pytest.fail('The journal was read.'))
+    journal.set('b', 2)
+
+    assert _lines(journal)[-1]['key'] == 'b'
+    assert os.path.getsize(journal._path) > size
+
+
+def test_transaction_should_append_every_change_at_once(journal):
+    with journal.transaction():
+        journal.set('a', 1)
+        journal.set('b', 2)
+
+    assert [line.get('key') for line in _lines(journal)] == [None, 'a', 'b']
+    assert [line.get('seq') for line in _lines(journal)] == [None, 1, 2]
+
+
+def test_journal_should_start_from_the_json_config(tmp_path):
+    seed = tmp_path / 'conf'
+    seed.write_text('{"user": "Nestor"}')
+    store = JournalStore(str(tmp_path / 'journal'), {}, seed=str(seed))
+
+    store.write({'email': 'admin@nestor.me'})
+
+    assert store.load() == {'user': 'Nestor', 'email': 'admin@nestor.me'}
+
+
+def test_undo_should_cancel_the_last_change(journal):
+    journal.set('a', 1)
+    journal.set('a', 2)
+    journal.remove('a')
+
+    assert journal.store.undo()['op'] == 'remove'
+    assert journal.store.undo()['seq'] == 2
+    assert CLIConfig(journal._path, backend='journal').get('a') == 1
+
+    history = journal.store.history()
+    assert [op['undone'] for op in history] == [False, True, True]
+
+
+def test_undo_without_history_should_do_nothing(journal):
+    assert journal.store.undo() is None
+
+
+def test_journal_should_be_compacted_past_its_size(tmp_path):
+    store = JournalStore(str(tmp_path / 'journal'), {}, max_size=2048, keep=5)
+
+    for i in range(100):
+        store.write({f'key{i % 10}': i})
+
+    assert os.path.getsize(store.path) < 4096
+    assert store.load() == {f'key{i}': 90 + i for i in range(10)}
+    assert len(store.history()) <= 5 + 2048 // 40
+    assert store.history()[-1]['seq'] == 100
+
+
+def test_large_journal_should_not_be_compacted_on_every_write(tmp_path, monkeypatch):
+    store = JournalStore(str(tmp_path / 'journal'), {f'key{i}': 'x' * 100 for i in range(100)}, max_size=2048)
+    compactions = []
+    compact = store.compact
+    monkeypatch.setattr(store, 'compact', lambda: compactions.append(1) or compact())
+
+    for i in range(20):
+        store.write({'a': i})
+
+    assert len(compactions) < 3
+    assert store.load()['a'] == 19
+
+
+def test_torn_last_line_should_be_skipped_and_cut(journal):
+    journal.set('a', 1)
+    journal.set('b', 2)
+    with open(journal._path, 'r+') as f:
+        f.truncate(os.path.getsize(journal._path) - 10)
+
+    conf = CLIConfig(journal._path, backend='journal')
+    assert conf.get('a') == 1
+    assert conf.get('b') is None
+
+    conf.set('c', 3)
+    assert [line.get('key') for line in _lines(conf)] == [None, 'a', 'c']
+    assert _lines(conf)[-1]['seq'] == 2
+
+
+def test_setting_the_same_value_should_not_append(journal):
+    journal.set('a', 1)
+    journal.get('a')
+    size = os.path.getsize(journal._path)
+
+    journal.set('a', 1)
+
+    assert os.path.getsize(journal._path) == size
+
+
+def test_journal_without_header_should_be_compacted_once(tmp_path):
+    path = tmp_path / 'journal'
+    path.write_text('{"op": "base", "value": {"a": 1}}\n{"seq": 1, "time": 0, "op": "set", "key": "b", "value": 2}\n')
+    store = JournalStore(str(path), {})
+
+    store.write({'c': 3})
+
+    assert json.loads(path.read_text().splitlines()[0])['last'] == 0
+    assert store.load() == {'a': 1, 'b': 2, 'c': 3}
+    assert store.history()[-1]['seq'] == 2
+
+
+def test_unknown_backend_should_raise_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        CLIConfig(str(tmp_path / 'conf'), backend='nope')
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    return CLIConfig(str(tmp_path / 'db'), backend='sqlite')
+
+
+def test_sqlite_should_start_with_the_defaults(database):
+    assert database.get('user') == 'undefined'
+    assert not os.path.exists(database._path)
+
+    database.set('user', 'Nestor')
+    assert CLIConfig(database._path, backend='sqlite').get('user') == 'Nestor'
+    assert CLIConfig(database._path, backend='sqlite').get('email') == 'undefined'
+
+
+def test_sqlite_get_should_read_one_row(database, monkeypatch):
+    database.set('qr', 'https://nestor.me')
+    conf = CLIConfig(database._path, backend='sqlite')
+
+    monkeypatch.setattr(conf.store, 'load', lambda: pytest.fail('Every value was read.'))
+    assert conf.get('qr') == 'https://nestor.me'
+    assert conf.get('missing', 1) == 1
+
+
+def test_sqlite_set_should_skip_the_same_value(database, monkeypatch):
+    database.set('qr', 'https://nestor.me')
+    conf = CLIConfig(database._path, backend='sqlite')
+
+    monkeypatch.setattr(conf.store, 'write', lambda changes: pytest.fail('The value was written.'))
+    conf.set('qr', 'https://nestor.me')
+
+
+def test_sqlite_should_keep_values_and_removals(database):
+    with database.transaction():
+        database.set('a', {'b': [1, 2]})
+        database.set('c', 1)
+        database.remove('c')
+        assert database.get('c') is None
+
+    conf = CLIConfig(database._path, backend='sqlite')
+    assert conf.get('a') == {'b': [1, 2]}
+    assert conf.get('c', 'gone') == 'gone'
+
+    with pytest.raises(KeyError):
+        conf.remove('c')
+
+
+def test_sqlite_items_should_use_the_key_index(database):
+    with database.transaction():
+        for key in ('tree.depth', 'tree.hidden', 'treeish', 'tre', 'qr.home'):
+            database.set(key, key)
+
+    assert sorted(database.items('tree.')) == ['tree.depth', 'tree.hidden']
+    assert sorted(database.items('tree')) == ['tree.depth', 'tree.hidden', 'treeish']
+
+    plan = database.store._connect().execute(
+        'EXPLAIN QUERY PLAN SELECT key, value FROM "main" WHERE key >= ? AND key < ?', ('a', 'b')).fetchall()
+    assert 'SEARCH' in plan[0][-1]
+
+
+def test_sqlite_namespaces_should_be_separate_tables(database):
+    qr = CLIConfig(database._path, backend='sqlite', namespace='qr')
+    qr.set('home', 'https://nestor.me')
+
+    assert qr.get('user') is None
+    assert database.get('home') is None
+    assert CLIConfig(database._path, backend='sqlite', namespace='qr').items() == {'home': 'https://nestor.me'}
+
+
+def test_namespaces_should_need_the_sqlite_backend(tmp_path):
+    with pytest.raises(ValueError):
+        CLIConfig(str(tmp_path / 'conf'), backend='json', namespace='qr')
+    with pytest.raises(ValueError):
+        CLIConfig(str(tmp_path / 'db'), backend='sqlite', namespace='drop table')
+
+
+def test_migrate_should_copy_the_json_config(tmp_path):
+    conf = CLIConfig(str(tmp_path / 'conf'), backend='json')
+    with conf.transaction():
+        conf.set('user', 'Nestor')
+        conf.set('config_templates', {'flake': ['.flake8', None]})
+
+    database = CLIConfig(str(tmp_path / 'db'), backend='sqlite')
+    assert migrate(conf.store, database.store) == 4
+
+    assert database.items() == CLIConfig(conf._path).items()
+
+
+def test_migrate_should_not_add_the_defaults(tmp_path):
+    path = tmp_path / 'conf'
+    path.write_text('{"user": "Nestor"}')
+    conf = CLIConfig(str(path), backend='json')
+
+    database = CLIConfig(str(tmp_path / 'db'), backend='sqlite')
+    assert migrate(conf.store, database.store) == 1
+
+    database = CLIConfig(database._path, backend='sqlite')
+    assert database.items() == {'user': 'Nestor'}
+    assert database.get('email') is None
+
+
+def test_migrate_should_make_the_values_the_journal_base(tmp_path):
+    conf = CLIConfig(str(tmp_path / 'conf'), backend='json')
+    conf.set('user', 'Nestor')
+
+    store = JournalStore(str(tmp_path / 'journal'), {}, seed=conf._path)
+    assert migrate(conf.store, store) == 3
+
+    assert store.history() == []
+    assert store.undo() is None
+    assert store.load() == CLIConfig(conf._path).items()
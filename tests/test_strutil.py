@@ -14,3 +14,14 @@ def test_str_width_limit():
 
     for s in result:
         assert sutil.print_length(s) <= 6
+
+
+@pytest.mark.parametrize('size, expected', [
+    (0, '0B'),
+    (1023, '1023B'),
+    (1024, '1.0K'),
+    (1536, '1.5K'),
+    (5 * 1024 ** 3, '5.0G'),
+])
+def test_human_size(size, expected):
+    assert sutil.human_size(size) == expected
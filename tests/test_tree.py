@@ -1,4 +1,5 @@
 import os
+import zipfile
 
 import pytest
 from click.testing import CliRunner
@@ -27,3 +28,48 @@ def test_list_filter():
     contents = ['...', '123', '.asdf']
     result = list(filter(lambda x: not x.startswith('.'), contents))
     assert len(result) == 1
+
+
+def test_diff_should_find_files_modified_after_a_cached_walk(runner, tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'f.txt').write_text('abc')
+    os.utime(root, (0, 0))
+    snap = str(tmp_path / 'snap')
+
+    assert runner.invoke(tree, ['--save-snapshot', snap, str(root)]).exit_code == 0
+    assert runner.invoke(tree, [str(root)]).exit_code == 0
+
+    with open(root / 'f.txt', 'a') as f:
+        f.write('x' * 100)
+    os.utime(root / 'f.txt', (10, 10))
+    os.utime(root, (0, 0))
+
+    result = runner.invoke(tree, ['--diff', snap, str(root)])
+    assert result.exit_code == 0, result.output
+    assert '~ f.txt' in result.output
+    assert '1 modified' in result.output
+
+
+def test_dupes_should_reject_archives(runner, tmp_path):
+    archive = str(tmp_path / 'same.zip')
+    with zipfile.ZipFile(archive, 'w') as f:
+        f.writestr('a', 'same')
+        f.writestr('b', 'same')
+
+    result = runner.invoke(tree, ['--dupes', archive])
+    assert result.exit_code == 2
+    assert '--dupes' in result.output
+
+
+def test_tree_should_not_write_the_config(runner, tmp_path, monkeypatch):
+    from nescli import config
+
+    def fail():
+        raise AssertionError('tree wrote the config.')
+
+    monkeypatch.setattr(config, '_write_config', fail)
+    (tmp_path / 'f').write_text('f')
+
+    assert runner.invoke(tree, [str(tmp_path)]).exit_code == 0
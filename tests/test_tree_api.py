@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from nescli import config, tree
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'a' / 'b')
+    os.makedirs(tmp_path / '.hidden')
+    (tmp_path / 'a' / 'x.txt').write_text('x')
+    return str(tmp_path)
+
+
+def test_walk_should_yield_nodes(sample):
+    nodes = list(tree.walk(sample, depth=1))
+
+    assert nodes[0].path == sample
+    assert sorted(node.name for node in nodes[1:]) == ['a', 'b', 'x.txt']
+
+
+def test_walk_should_take_walker_options(sample):
+    names = [node.name for node in tree.walk(sample, show_hidden=True, sort='name')]
+
+    assert names == [os.path.basename(sample), '.hidden', 'a', 'b', 'x.txt']
+
+
+def test_render_should_yield_plain_lines(sample):
+    lines = list(tree.render(tree.walk(sample, sort='name')))
+
+    assert lines[1:] == ['└─┬a', '  ├──b', '  └──x.txt']
+
+
+def test_api_should_not_touch_the_config(sample, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('The tree API wrote the config.')
+
+    monkeypatch.setattr(config, 'set', fail)
+    monkeypatch.setattr(config, '_write_config', fail)
+
+    list(tree.render(tree.walk(sample)))
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from nescli.core.tree import ListingCache, walk
+
+
+@pytest.fixture
+def sample(tmp_path):
+    root = tmp_path / 'root'
+    os.makedirs(root / 'a' / 'b')
+    (root / 'a' / 'x.txt').write_text('x')
+    _settle(root)
+    return str(root)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ListingCache(str(tmp_path / 'cache'))
+
+
+def _settle(path):
+    for dirpath, _, _ in os.walk(path):
+        os.utime(dirpath, (0, 0))
+
+
+def _paths(path, **options):
+    return [node.path for node in walk(path, **options)]
+
+
+def test_second_walk_should_hit_the_cache(sample, cache):
+    first = _paths(sample, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    cache = ListingCache(cache.folder)
+    assert _paths(sample, cache=cache) == first
+    assert (cache.hits, cache.misses) == (3, 0)
+
+
+def test_changed_directory_should_be_listed_again(sample, cache):
+    _paths(sample, cache=cache)
+
+    os.mkdir(os.path.join(sample, 'a', 'new'))
+    _settle(sample)
+    os.utime(os.path.join(sample, 'a'), (1, 1))
+
+    cache = ListingCache(cache.folder)
+    assert os.path.join(sample, 'a', 'new') in _paths(sample, cache=cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_settings_should_have_their_own_snapshot(sample, cache):
+    _paths(sample, cache=cache)
+    _paths(sample, cache=cache, show_hidden=True)
+
+    assert cache.stats()['snapshots'] == 2
+
+
+def test_cache_should_stay_under_max_size(sample, tmp_path):
+    cache = ListingCache(str(tmp_path / 'cache'), max_size=1)
+    _paths(sample, cache=cache)
+
+    assert cache.stats()['snapshots'] == 0
+    assert cache.stats()['misses'] == 3
+
+
+def test_cut_listings_should_not_be_cached(sample, cache):
+    for i in range(5):
+        open(os.path.join(sample, 'a', 'b', f'file{i}'), 'w').close()
+    _settle(sample)
+
+    _paths(sample, cache=cache, max_entries=2)
+    cache = ListingCache(cache.folder)
+    _paths(sample, cache=cache, max_entries=2)
+
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+@pytest.mark.parametrize('options', [dict(du=True), dict(collect_stat=True), dict(sort='size')])
+def test_cached_listing_should_not_reuse_stat(sample, cache, options):
+    path = os.path.join(sample, 'a', 'x.txt')
+    _paths(sample, cache=cache, **options)
+
+    with open(path, 'a') as f:
+        f.write('x' * 100_000)
+    _settle(sample)
+
+    cache = ListingCache(cache.folder)
+    sizes = {node.path: node.stat.st_size for node in list(walk(sample, cache=cache, **options))[1:]}
+
+    assert cache.hits == 3
+    assert sizes[path] == 100_001
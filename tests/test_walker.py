@@ -0,0 +1,247 @@
+import os
+
+import pytest
+
+from nescli.core.tree import Node, walk, render
+from utils.strutil import TabChar
+
+
+@pytest.fixture
+def sample(tmp_path):
+    os.makedirs(tmp_path / 'a' / 'b' / 'c')
+    os.makedirs(tmp_path / '.hidden')
+    os.makedirs(tmp_path / '__pycache__')
+    (tmp_path / 'a' / 'x.txt').write_text('x')
+    (tmp_path / 'a' / 'b' / 'c' / 'z').write_text('z')
+    (tmp_path / 'top').write_text('top')
+    return str(tmp_path)
+
+
+def _names(nodes, depth=1):
+    return sorted(node.name for node in nodes if node.depth == depth)
+
+
+def test_walk_should_yield_root_first(sample):
+    root = next(walk(sample))
+
+    assert root.depth == 0
+    assert root.is_dir
+    assert root.has_children
+
+
+def test_walk_should_yield_nodes_in_pre_order(sample):
+    nodes = list(walk(sample, max_depth=0))
+
+    assert _names(nodes) == ['a', 'top']
+
+    paths = [node.path for node in nodes]
+    a = paths.index(os.path.join(sample, 'a'))
+    assert paths[a + 1].startswith(os.path.join(sample, 'a') + os.sep)
+
+
+def test_walk_should_mark_last_sibling(sample):
+    nodes = [node for node in walk(sample) if node.depth == 1]
+
+    assert [node.is_last for node in nodes] == [False, True]
+
+
+def test_walk_should_skip_hidden_by_default(sample):
+    assert '.hidden' not in _names(walk(sample))
+    assert '__pycache__' not in _names(walk(sample))
+
+    names = _names(walk(sample, show_hidden=True))
+    assert '.hidden' in names
+    assert '__pycache__' in names
+
+
+def test_walk_should_respect_max_depth(sample):
+    nodes = list(walk(sample, max_depth=1))
+    b = next(node for node in nodes if node.name == 'b')
+
+    assert b.is_dir
+    assert not b.has_children
+    assert 'c' not in _names(nodes, depth=3)
+
+
+def test_render_should_close_last_branches():
+    nodes = [
+        Node('root', '/root', 0, is_dir=True, has_children=True),
+        Node('a', '/root/a', 1, is_dir=True, is_last=False, has_children=True),
+        Node('x', '/root/a/x', 2),
+        Node('b', '/root/b', 1, is_dir=True, has_children=True),
+        Node('y', '/root/b/y', 2),
+    ]
+
+    assert [line.content for line in render(nodes)] == [
+        '┌root',
+        '├─┬a',
+        '│ └──x',
+        '└─┬b',
+        '  └──y',
+    ]
+
+
+def test_render_should_be_lazy():
+    def nodes():
+        yield Node('root', '/root', 0, is_dir=True, has_children=True)
+        yield Node('a', '/root/a', 1, is_last=False)
+        raise AssertionError('render consumed more nodes than needed.')
+
+    lines = render(nodes())
+
+    assert next(lines).content == '┌root'
+    assert next(lines).content == '├──a'
+
+
+@pytest.fixture
+def deep_chain(tmp_path):
+    levels = 5000
+    fd = os.open(tmp_path, os.O_RDONLY)
+
+    for _ in range(levels):
+        os.mkdir('d', dir_fd=fd)
+        child = os.open('d', os.O_RDONLY, dir_fd=fd)
+        os.close(fd)
+        fd = child
+
+    yield str(tmp_path), levels
+
+    for _ in range(levels):
+        parent = os.open('..', os.O_RDONLY, dir_fd=fd)
+        os.close(fd)
+        fd = parent
+        os.rmdir('d', dir_fd=fd)
+
+    os.close(fd)
+
+
+def test_walk_should_survive_very_deep_hierarchies(deep_chain):
+    path, levels = deep_chain
+
+    depth = 0
+    for node in walk(path, max_depth=0):
+        assert node.depth == depth
+        depth += 1
+
+    assert depth == levels + 1
+
+    last = None
+    for last in render(walk(path, max_depth=0)):
+        pass
+
+    assert last.content.endswith(TabChar.CORNER_BOTTOM_LEFT + TabChar.INDENT * 2 + 'd')
+    assert len(last.content) == (levels - 1) * 2 + 4
+
+
+@pytest.fixture
+def linked(sample):
+    os.symlink('..', os.path.join(sample, 'a', 'loop'))
+    os.symlink('a', os.path.join(sample, 'alink'))
+    return sample
+
+
+def test_walk_should_not_follow_links_by_default(linked):
+    nodes = list(walk(linked, max_depth=0))
+    links = {node.name: node for node in nodes if node.is_link}
+
+    assert links['alink'].target == 'a'
+    assert not links['alink'].is_dir
+    assert links['loop'].target == '..'
+    assert len([node for node in nodes if node.name == 'x.txt']) == 1
+
+
+def test_walk_should_stop_at_link_loops_when_following(linked):
+    nodes = list(walk(linked, max_depth=0, follow_links=True))
+    revisited = [node for node in nodes if node.target and not node.has_children]
+
+    assert len([node for node in nodes if node.name == 'x.txt']) == 1
+    assert {node.name for node in revisited} >= {'loop'}
+    assert all(node.depth < 5 for node in nodes)
+
+
+def test_parallel_walk_should_keep_walk_order(sample):
+    for i in range(20):
+        os.makedirs(os.path.join(sample, 'many', f'dir{i}', 'sub'))
+
+    sequential = [(node.path, node.is_last, node.has_children)
+                  for node in walk(sample, max_depth=0)]
+    parallel = [(node.path, node.is_last, node.has_children)
+                for node in walk(sample, max_depth=0, jobs=4)]
+
+    assert parallel == sequential
+
+
+def test_parallel_walk_should_survive_very_deep_hierarchies(deep_chain):
+    path, levels = deep_chain
+
+    assert sum(1 for _ in walk(path, max_depth=0, jobs=4)) == levels + 1
+
+
+@pytest.fixture
+def crowded(tmp_path):
+    for i in range(50):
+        (tmp_path / f'file{i}').write_text('')
+    (tmp_path / '.hidden').write_text('')
+    return str(tmp_path)
+
+
+def test_max_entries_should_count_the_rest(crowded):
+    nodes = list(walk(crowded, max_entries=10))
+
+    assert len(nodes) == 12
+    assert nodes[-1].omitted == 40
+    assert nodes[-1].is_last
+    assert not any(node.is_last for node in nodes[1:-1])
+
+
+def test_max_entries_should_keep_small_directories(crowded):
+    nodes = list(walk(crowded, max_entries=50))
+
+    assert len(nodes) == 51
+    assert not any(node.omitted for node in nodes)
+
+
+def test_time_budget_should_truncate_directories(sample):
+    nodes = list(walk(sample, time_budget=0))
+    a = next(node for node in nodes if node.name == 'a')
+
+    assert a.truncated
+    assert not a.has_children
+    assert all(node.depth <= 1 for node in nodes)
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    for name in ['file10', 'File2', 'file1']:
+        (tmp_path / name).write_text(name)
+    os.makedirs(tmp_path / 'z_dir')
+    os.utime(tmp_path / 'file10', (0, 0))
+    return str(tmp_path)
+
+
+def _order(path, **options):
+    return [node.name for node in walk(path, **options) if node.depth == 1]
+
+
+def test_walk_should_sort_names_naturally(numbered):
+    assert _order(numbered, sort='name') == ['file1', 'file10', 'File2', 'z_dir']
+    assert _order(numbered, sort='natural') == ['file1', 'File2', 'file10', 'z_dir']
+
+
+def test_walk_should_sort_by_stat_from_the_listing(numbered):
+    files = [name for name in _order(numbered, sort='size') if name != 'z_dir']
+    assert files == ['file1', 'File2', 'file10']
+    assert _order(numbered, sort='mtime')[0] == 'file10'
+
+
+def test_walk_should_list_dirs_first_in_reverse(numbered):
+    assert _order(numbered, sort='natural', dirs_first=True, reverse=True) == [
+        'z_dir', 'file10', 'File2', 'file1']
+
+
+def test_sorted_walk_should_cap_after_sorting(numbered):
+    nodes = [node for node in walk(numbered, sort='natural', max_entries=2) if node.depth == 1]
+
+    assert [node.name for node in nodes[:2]] == ['file1', 'File2']
+    assert nodes[-1].omitted == 2
+    assert nodes[-1].is_last
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from nescli.core.tree import Walker, render
+from nescli.core.tree.watch import Watcher, supported
+
+pytestmark = pytest.mark.skipif(not supported(), reason='inotify is only available on Linux')
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    os.makedirs(tmp_path / 'out' / 'logs')
+    (tmp_path / 'out' / 'a.txt').write_text('a')
+    with Watcher(Walker(max_depth=0, sort='name'), str(tmp_path), debounce=0.05) as watcher:
+        yield watcher
+
+
+def _paths(watcher):
+    return [node.path[len(watcher.path) + 1:] for node in watcher.nodes()][1:]
+
+
+def _update(watcher):
+    changed = watcher.changes(timeout=2)
+    watcher.refresh(changed)
+    return changed
+
+
+def test_watcher_should_list_like_the_walker(watcher):
+    assert _paths(watcher) == ['out', 'out/a.txt', 'out/logs']
+
+
+def test_watcher_should_relist_changed_directories_only(watcher):
+    open(os.path.join(watcher.path, 'out', 'logs', 'new.log'), 'w').close()
+
+    assert _update(watcher) == {os.path.join(watcher.path, 'out', 'logs')}
+    assert 'out/logs/new.log' in _paths(watcher)
+
+
+def test_watcher_should_walk_new_and_forget_removed_directories(watcher):
+    os.makedirs(os.path.join(watcher.path, 'out', 'new', 'deep'))
+    _update(watcher)
+    assert 'out/new/deep' in _paths(watcher)
+
+    os.rmdir(os.path.join(watcher.path, 'out', 'new', 'deep'))
+    os.rmdir(os.path.join(watcher.path, 'out', 'new'))
+    _update(watcher)
+    assert not any(path.startswith('out/new') for path in _paths(watcher))
+
+    open(os.path.join(watcher.path, 'out', 'new'), 'w').close()
+    _update(watcher)
+    assert 'out/new' in _paths(watcher)
+
+
+def test_watcher_should_only_forget_removed_directories(watcher, monkeypatch):
+    for i in range(20):
+        open(os.path.join(watcher.path, 'out', f'f{i}'), 'w').close()
+    _update(watcher)
+
+    forgotten = []
+    forget = watcher._forget
+    monkeypatch.setattr(watcher, '_forget', lambda path: forgotten.append(path) or forget(path))
+
+    os.remove(os.path.join(watcher.path, 'out', 'f0'))
+    _update(watcher)
+    assert forgotten == []
+
+    os.rmdir(os.path.join(watcher.path, 'out', 'logs'))
+    _update(watcher)
+    assert forgotten == [os.path.join(watcher.path, 'out', 'logs')]
+
+
+def test_watcher_should_coalesce_bursts(watcher):
+    for i in range(200):
+        open(os.path.join(watcher.path, 'out', f'f{i}'), 'w').close()
+
+    assert _update(watcher) == {os.path.join(watcher.path, 'out')}
+    assert watcher.changes(timeout=0.1) == set()
+    assert len(_paths(watcher)) == 203
+
+
+def test_watcher_should_render_current_tree(watcher):
+    os.remove(os.path.join(watcher.path, 'out', 'a.txt'))
+    _update(watcher)
+
+    assert [line.content for line in render(watcher.nodes())][1:] == [
+        '└─┬out',
+        '  └──logs',
+    ]
@@ -1,3 +1,3 @@
 from .message import msgbox, MessageType
-from .echoutils import echo, es
+from .echoutils import echo, es, BufferedSink
 from . import futil as futil
@@ -7,3 +7,4 @@
 """ docstring """
 
 from .echo_manager import echo, es
+from .sink import BufferedSink
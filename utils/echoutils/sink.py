@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# @File    :   echoutils/sink.py
+# @Time    :   2026-10-19 00:41:27
+# @Author  :   Nestor
+# @Email   :   admin@nestor.me
+
+""" Buffered writer for large amounts of output lines """
+
+from __future__ import annotations
+
+import sys
+import time
+import typing as t
+
+import click
+
+
+class BufferedSink:
+
+    """
+    Write lines in large chunks instead of one `click.echo` call per line.
+
+    The escape codes of each color are computed once. When the stream is not
+    a terminal the lines are written without styling. Pending lines are written
+    when the buffer is full, when `interval` seconds passed since the last
+    write, and when the sink is closed, so the output still looks live.
+
+    .. code-block:: python
+
+        with BufferedSink() as out:
+            for line in lines:
+                out.write(line, fg='blue')
+    """
+
+    RESET = '\033[0m'
+
+    def __init__(
+            self, file: t.Optional[t.IO] = None,
+            color: t.Optional[bool] = None,
+            buffer_size: int = 64 * 1024,
+            interval: float = 0.1
+    ):
+        self.file = file or sys.stdout
+        self.color = _isatty(self.file) if color is None else color
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self._parts: t.List[str] = []
+        self._size = 0
+        self._last = time.monotonic()
+        self._styles: t.Dict[str, str] = {}
+
+    def write(self, line: str, fg: t.Optional[str] = None, nl: bool = True):
+        if self.color and fg:
+            line = self._style(fg) + line + self.RESET
+
+        if nl:
+            line += '\n'
+
+        self._parts.append(line)
+        self._size += len(line)
+
+        if self._size >= self.buffer_size or time.monotonic() - self._last >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.file.write(''.join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+        self.file.flush()
+        self._last = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    def _style(self, fg: str) -> str:
+        style = self._styles.get(fg)
+        if style is None:
+            style = self._styles[fg] = click.style('', fg=fg, reset=False)
+        return style
+
+    def __enter__(self) -> BufferedSink:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _isatty(file: t.IO) -> bool:
+    try:
+        return file.isatty()
+    except (AttributeError, ValueError):
+        return False
@@ -115,3 +115,24 @@ def is_last_word_break(line: str, new_line: str) -> bool:
 
     if line[-1].isalpha() and new_line[0].isalpha() and ' ' in line:
         return True
+
+
+def human_size(size: int) -> str:
+    """
+    Format a size in bytes with a binary unit, like `du -h`.
+
+        .. code-block:: python
+            human_size(512)   # '512B'
+            human_size(1536)  # '1.5K'
+
+    :param int size: Size in bytes.
+    :return str: Size with one decimal and a unit from `B` to `P`.
+    """
+
+    value = float(size)
+    for unit in 'BKMGT':
+        if abs(value) < 1024:
+            return f'{size}B' if unit == 'B' else f'{value:.1f}{unit}'
+        value /= 1024
+
+    return f'{value:.1f}P'